@@ -0,0 +1,377 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Project demonstrating a B+ tree with linked leaves
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import sys
+from bisect import bisect_left, bisect_right
+
+# Default fan-out: most keys a leaf holds, and most children an internal node has
+DEFAULT_ORDER = 64
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Leaf node class - a sorted list of keys plus a link to the next leaf
+class LeafNode:
+    __slots__ = ("keys", "next")
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else []
+        self.next = None
+
+
+# Internal node class - children[i] holds the keys k with keys[i - 1] <= k < keys[i]
+class InternalNode:
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys=None, children=None):
+        self.keys = keys if keys is not None else []
+        self.children = children if children is not None else []
+
+
+# B+ tree class - same interface as the BinarySearchTree classes
+# Each node keeps up to `order` keys in one list, so a lookup searches a few wide nodes with bisect
+# instead of chasing a pointer per comparison, and the tree is only log_order(n) levels deep.
+# All keys live in the leaves, which are chained in order, so traversal and range scans just walk
+# the chain. There is no binary tree shape, so traverse() only supports inorder
+class BPlusTree:
+    # Constructor
+    def __init__(self, order=DEFAULT_ORDER):
+        if order < 3:
+            raise ValueError("A B+ tree needs an order of at least 3")
+        self.order = order
+        # Fewest keys a leaf or internal node other than the root may hold
+        self.min_leaf_keys = order // 2
+        self.min_internal_keys = (order - 1) // 2
+        self.root = LeafNode()
+        self.size = 0
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder()
+
+    # Method to find the leaf that holds (or would hold) a value
+    def _find_leaf(self, value):
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[bisect_right(node.keys, value)]
+        return node
+
+    # Method to insert a value into the tree
+    def insert(self, value):
+        split = self._insert_rec(self.root, value)
+        # The root split - grow the tree by one level
+        if split is not None:
+            separator, right = split
+            self.root = InternalNode([separator], [self.root, right])
+
+    # Recursive method to insert a value below node
+    # Returns (separator, new right sibling) when node had to split, None otherwise
+    def _insert_rec(self, node, value):
+        if isinstance(node, LeafNode):
+            keys = node.keys
+            i = bisect_left(keys, value)
+            if i < len(keys) and keys[i] == value:
+                return None  # Duplicate values not allowed
+            keys.insert(i, value)
+            self.size += 1
+            if len(keys) <= self.order:
+                return None
+            # Split the leaf in half and link the new half in after it
+            middle = len(keys) // 2
+            right = LeafNode(keys[middle:])
+            del keys[middle:]
+            right.next = node.next
+            node.next = right
+            return right.keys[0], right
+
+        i = bisect_right(node.keys, value)
+        split = self._insert_rec(node.children[i], value)
+        if split is None:
+            return None
+        separator, child = split
+        node.keys.insert(i, separator)
+        node.children.insert(i + 1, child)
+        if len(node.children) <= self.order:
+            return None
+        # Split the internal node - the middle key moves up instead of being copied
+        middle = len(node.keys) // 2
+        separator = node.keys[middle]
+        right = InternalNode(node.keys[middle + 1:], node.children[middle + 1:])
+        del node.keys[middle:]
+        del node.children[middle + 1:]
+        return separator, right
+
+    # Method to delete a value from the tree
+    def delete(self, value):
+        self._delete_rec(self.root, value)
+        # The root lost its last separator - shrink the tree by one level
+        if isinstance(self.root, InternalNode) and not self.root.keys:
+            self.root = self.root.children[0]
+
+    # Recursive method to delete a value below node, fixing any child left with too few keys on the way back up
+    def _delete_rec(self, node, value):
+        if isinstance(node, LeafNode):
+            i = bisect_left(node.keys, value)
+            if i < len(node.keys) and node.keys[i] == value:
+                del node.keys[i]
+                self.size -= 1
+            return
+
+        i = bisect_right(node.keys, value)
+        child = node.children[i]
+        self._delete_rec(child, value)
+        if isinstance(child, LeafNode):
+            if len(child.keys) < self.min_leaf_keys:
+                self._fix_leaf(node, i)
+        elif len(child.keys) < self.min_internal_keys:
+            self._fix_internal(node, i)
+
+    # Method to refill the leaf parent.children[i] from a sibling, or merge it with one
+    def _fix_leaf(self, parent, i):
+        child = parent.children[i]
+        left = parent.children[i - 1] if i > 0 else None
+        right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+        # Borrow the left sibling's largest key
+        if left is not None and len(left.keys) > self.min_leaf_keys:
+            child.keys.insert(0, left.keys.pop())
+            parent.keys[i - 1] = child.keys[0]
+        # Borrow the right sibling's smallest key
+        elif right is not None and len(right.keys) > self.min_leaf_keys:
+            child.keys.append(right.keys.pop(0))
+            parent.keys[i] = right.keys[0]
+        # Merge into the left sibling
+        elif left is not None:
+            left.keys.extend(child.keys)
+            left.next = child.next
+            del parent.keys[i - 1]
+            del parent.children[i]
+        # Merge the right sibling in
+        elif right is not None:
+            child.keys.extend(right.keys)
+            child.next = right.next
+            del parent.keys[i]
+            del parent.children[i + 1]
+
+    # Method to refill the internal node parent.children[i] from a sibling, or merge it with one
+    # Keys move through the parent: the separator comes down and the sibling's end key goes up
+    def _fix_internal(self, parent, i):
+        child = parent.children[i]
+        left = parent.children[i - 1] if i > 0 else None
+        right = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+        if left is not None and len(left.keys) > self.min_internal_keys:
+            child.keys.insert(0, parent.keys[i - 1])
+            child.children.insert(0, left.children.pop())
+            parent.keys[i - 1] = left.keys.pop()
+        elif right is not None and len(right.keys) > self.min_internal_keys:
+            child.keys.append(parent.keys[i])
+            child.children.append(right.children.pop(0))
+            parent.keys[i] = right.keys.pop(0)
+        elif left is not None:
+            left.keys.append(parent.keys[i - 1])
+            left.keys.extend(child.keys)
+            left.children.extend(child.children)
+            del parent.keys[i - 1]
+            del parent.children[i]
+        elif right is not None:
+            child.keys.append(parent.keys[i])
+            child.keys.extend(right.keys)
+            child.children.extend(right.children)
+            del parent.keys[i]
+            del parent.children[i + 1]
+
+    # Method to check whether a value is in the tree
+    def search(self, value):
+        keys = self._find_leaf(value).keys
+        i = bisect_left(keys, value)
+        return i < len(keys) and keys[i] == value
+
+    # Method to find the maximum value in the tree - the last key of the rightmost leaf
+    def maximum(self):
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    # Method to find the leftmost leaf, where the leaf chain starts
+    def _first_leaf(self):
+        node = self.root
+        while isinstance(node, InternalNode):
+            node = node.children[0]
+        return node
+
+    # Method to return an iterator positioned at the first value >= x
+    def seek(self, x):
+        leaf = self._find_leaf(x)
+        return self._scan(leaf, bisect_left(leaf.keys, x))
+
+    # Generator walking the leaf chain from position i of a leaf
+    def _scan(self, leaf, i):
+        while leaf is not None:
+            keys = leaf.keys
+            while i < len(keys):
+                yield keys[i]
+                i += 1
+            leaf = leaf.next
+            i = 0
+
+    # Generator over the values between lo and hi (both included) in sorted order
+    def iter_range(self, lo, hi):
+        for value in self.seek(lo):
+            if value > hi:
+                return
+            yield value
+
+    # Method to traverse the tree in sorted order
+    # Copies a whole leaf at a time into one list allocated up front
+    def traverse(self, order="inorder"):
+        if order != "inorder":
+            raise ValueError("A B+ tree keeps its values in the leaves, so 'inorder' is the only traversal order.")
+        result = [None] * self.size
+        i = 0
+        leaf = self._first_leaf()
+        while leaf is not None:
+            result[i:i + len(leaf.keys)] = leaf.keys
+            i += len(leaf.keys)
+            leaf = leaf.next
+        return result
+
+    # Method to return a lazy iterator over the values in sorted order
+    def iter_traverse(self, order="inorder"):
+        if order != "inorder":
+            raise ValueError("A B+ tree keeps its values in the leaves, so 'inorder' is the only traversal order.")
+        return self._inorder()
+
+    # Generator walking the leaf chain from the start
+    def _inorder(self):
+        leaf = self._first_leaf()
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    # Method to bulk load a tree from values in increasing order in O(n), one level at a time
+    # Nodes are filled evenly (all of them at least half full) rather than packed, so later inserts don't
+    # split every leaf. Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable, order=DEFAULT_ORDER):
+        values = []
+        for value in iterable:
+            if values and value <= values[-1]:
+                if value == values[-1]:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {values[-1]}")
+            values.append(value)
+        tree = cls(order)
+        if not values:
+            return tree
+
+        # Leaves, chained in order, with the smallest key under each node
+        level = [LeafNode(values[low:high]) for low, high in cls._even_groups(len(values), order)]
+        for leaf, next_leaf in zip(level, level[1:]):
+            leaf.next = next_leaf
+        smallest = [leaf.keys[0] for leaf in level]
+
+        # Internal levels until a single node is left
+        while len(level) > 1:
+            parents, parent_smallest = [], []
+            for low, high in cls._even_groups(len(level), order):
+                parents.append(InternalNode(smallest[low + 1:high], level[low:high]))
+                parent_smallest.append(smallest[low])
+            level, smallest = parents, parent_smallest
+
+        tree.root = level[0]
+        tree.size = len(values)
+        return tree
+
+    # Function to split count items into as few groups of at most order items as possible, all about the same size
+    @staticmethod
+    def _even_groups(count, order):
+        groups = -(-count // order)
+        base, extra = divmod(count, groups)
+        low = 0
+        for g in range(groups):
+            high = low + base + (1 if g < extra else 0)
+            yield low, high
+            low = high
+
+    # Method to remove every value at once
+    def clear(self):
+        self.root = LeafNode()
+        self.size = 0
+
+    # Method to check the B+ tree rules: keys sorted and within their separators, node sizes within
+    # bounds, all leaves at the same depth, the leaf chain in order, and the size correct
+    # Raises AssertionError at the first problem and returns the tree height otherwise
+    def check_invariants(self):
+        leaf_depth = None
+        leaves = []
+        # (node, lower bound, upper bound, depth)
+        stack = [(self.root, None, None, 1)]
+        while stack:
+            node, low, high, depth = stack.pop()
+            keys = node.keys
+            if any(a >= b for a, b in zip(keys, keys[1:])):
+                raise AssertionError(f"Node keys {keys} are not increasing")
+            if keys and ((low is not None and keys[0] < low) or (high is not None and keys[-1] >= high)):
+                raise AssertionError(f"Node keys {keys} fall outside [{low}, {high})")
+            is_root = node is self.root
+            if isinstance(node, LeafNode):
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    raise AssertionError(f"Leaves at depths {leaf_depth} and {depth}")
+                if len(keys) > self.order or (not is_root and len(keys) < self.min_leaf_keys):
+                    raise AssertionError(f"Leaf holds {len(keys)} keys")
+                leaves.append(node)
+                continue
+            if len(node.children) != len(keys) + 1:
+                raise AssertionError(f"Internal node has {len(keys)} keys but {len(node.children)} children")
+            if len(node.children) > self.order or (not is_root and len(keys) < self.min_internal_keys) or not keys:
+                raise AssertionError(f"Internal node holds {len(keys)} keys")
+            bounds = [low] + keys + [high]
+            # Push right to left so the leaves are collected in order
+            for i in range(len(node.children) - 1, -1, -1):
+                stack.append((node.children[i], bounds[i], bounds[i + 1], depth + 1))
+
+        # The chain must link exactly the leaves found from the root, in order
+        leaf = leaves[0]
+        for expected in leaves:
+            if leaf is not expected:
+                raise AssertionError("The leaf chain skips or repeats a leaf")
+            leaf = leaf.next
+        if leaf is not None:
+            raise AssertionError("The leaf chain runs past the last leaf")
+        count = sum(len(leaf.keys) for leaf in leaves)
+        if count != self.size:
+            raise AssertionError(f"Tree holds {count} values but its size is {self.size}")
+        return leaf_depth
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to time the same workload at several fan-outs, to see where wider nodes stop helping
+def compare_orders(size, orders=(8, 32, 64, 128, 256), seed=0):
+    from benchmark import generate_values, timed_call
+    values = generate_values(size, "shuffled", seed)
+    print(f"{size} keys:")
+    for order in orders:
+        tree = BPlusTree(order)
+        _, perf_time_insert = timed_call(lambda: [tree.insert(x) for x in values])
+        height = tree.check_invariants()
+        _, perf_time_traverse = timed_call(tree.traverse)
+        _, perf_time_delete = timed_call(lambda: [tree.delete(x) for x in values])
+        print(f"  order {order:>3}: height {height}, insert {perf_time_insert:.4f} s, "
+              f"traverse {perf_time_traverse:.4f} s, delete {perf_time_delete:.4f} s")
+
+# Usage: python B_Plus_Tree.py [benchmark options] - runs the shared benchmark with the default order, then compares orders
+if __name__ == "__main__":
+    from benchmark import main, parse_arguments
+    main(sys.argv[1:], default_engines=("bplus",))
+    options = parse_arguments(sys.argv[1:], default_engines=("bplus",))
+    for size in options.sizes:
+        compare_orders(size, seed=options.seed)
@@ -0,0 +1,321 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Self-balancing binary search tree stored in flat arrays instead of node objects
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import gc, sys, random, tracemalloc
+from array import array
+from Self_Balancing import BinarySearchTree, measure_time
+from sorted_tree import merge_sorted
+
+# Index of the empty subtree; slot 0 of every array is reserved for it
+NIL = 0
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# AVL tree with a struct-of-arrays node pool: node i is values[i], left[i], right[i] and heights[i]
+# Same core API as Self_Balancing.BinarySearchTree (without the order statistics, which would need
+# another array of subtree sizes), and values must be integers that fit in 64 bits
+class CompactAVLTree:
+    # Constructor
+    def __init__(self):
+        self.values = array('q', [0])
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.heights = array('b', [0])
+        self.root = NIL
+        self.size = 0
+        # Slots freed by delete, chained through left[], reused before the arrays grow
+        self.free = NIL
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder(self.root)
+
+    # Method to take a slot for a new leaf, reusing a freed one if there is any
+    def _new_node(self, value):
+        if self.free != NIL:
+            i = self.free
+            self.free = self.left[i]
+            self.values[i] = value
+            self.left[i] = self.right[i] = NIL
+            self.heights[i] = 1
+            return i
+        self.values.append(value)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.heights.append(1)
+        return len(self.values) - 1
+
+    # Method to give a deleted node's slot back to the pool
+    def _free_node(self, i):
+        self.left[i] = self.free
+        self.right[i] = NIL
+        self.heights[i] = 0
+        self.free = i
+
+    # Method to insert a value into the tree
+    def insert(self, value):
+        self.root = self._insert_rec(self.root, value)
+
+    # Recursive method to insert a value into the subtree at index i, returning the subtree's new root
+    def _insert_rec(self, i, value):
+        if i == NIL:
+            self.size += 1
+            return self._new_node(value)
+
+        # Less goes left, greater goes right
+        if value < self.values[i]:
+            self.left[i] = self._insert_rec(self.left[i], value)
+        elif value > self.values[i]:
+            self.right[i] = self._insert_rec(self.right[i], value)
+        else:
+            return i  # Duplicate values not allowed
+
+        return self._rebalance(i)
+
+    # Method to delete a value from the tree while keeping the tree balanced
+    def delete(self, value):
+        self.root = self._delete_rec(self.root, value)
+
+    # Recursive method to delete a value from the subtree at index i, returning the subtree's new root
+    def _delete_rec(self, i, value):
+        # Value not in the tree - Base Case
+        if i == NIL:
+            return i
+
+        # Lesser values go left, greater values go right
+        if value < self.values[i]:
+            self.left[i] = self._delete_rec(self.left[i], value)
+        elif value > self.values[i]:
+            self.right[i] = self._delete_rec(self.right[i], value)
+        else:
+            # Case 1: No child or one child - replace the node with its only child (or NIL)
+            if self.left[i] == NIL or self.right[i] == NIL:
+                child = self.left[i] if self.left[i] != NIL else self.right[i]
+                self._free_node(i)
+                self.size -= 1
+                return child
+
+            # Case 2: Two children - take the inorder successor's value, then delete the successor
+            successor = self.right[i]
+            while self.left[successor] != NIL:
+                successor = self.left[successor]
+            self.values[i] = self.values[successor]
+            self.right[i] = self._delete_rec(self.right[i], self.values[i])
+
+        return self._rebalance(i)
+
+    # Method to update the height of node i and rotate it if its subtrees differ in height by 2
+    def _rebalance(self, i):
+        heights, left, right = self.heights, self.left, self.right
+        balance = heights[left[i]] - heights[right[i]]
+
+        # Left heavy
+        if balance > 1:
+            # Left Right Case
+            if heights[left[left[i]]] < heights[right[left[i]]]:
+                left[i] = self._left_rotate(left[i])
+            # Left Left Case
+            return self._right_rotate(i)
+
+        # Right heavy
+        if balance < -1:
+            # Right Left Case
+            if heights[right[right[i]]] < heights[left[right[i]]]:
+                right[i] = self._right_rotate(right[i])
+            # Right Right Case
+            return self._left_rotate(i)
+
+        heights[i] = max(heights[left[i]], heights[right[i]]) + 1
+        return i
+
+    # Helper method for right rotation
+    def _right_rotate(self, y):
+        heights, left, right = self.heights, self.left, self.right
+        x = left[y]
+        left[y] = right[x]
+        right[x] = y
+        heights[y] = max(heights[left[y]], heights[right[y]]) + 1
+        heights[x] = max(heights[left[x]], heights[right[x]]) + 1
+        return x
+
+    # Helper method for left rotation
+    def _left_rotate(self, x):
+        heights, left, right = self.heights, self.left, self.right
+        y = right[x]
+        right[x] = left[y]
+        left[y] = x
+        heights[x] = max(heights[left[x]], heights[right[x]]) + 1
+        heights[y] = max(heights[left[y]], heights[right[y]]) + 1
+        return y
+
+    # Method to find the maximum value in the tree - the rightmost node
+    def maximum(self):
+        if self.root == NIL:
+            return None
+        i = self.root
+        while self.right[i] != NIL:
+            i = self.right[i]
+        return self.values[i]
+
+    # Method to traverse the tree in a specific order - default to inorder traversal
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
+    def traverse(self, order="inorder"):
+        result = [None] * self.size
+        i = 0
+        for value in self.iter_traverse(order):
+            result[i] = value
+            i += 1
+        return result
+
+    # Method to return a lazy iterator over the tree in a specific order
+    def iter_traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._inorder(self.root)
+        elif order == "preorder":
+            return self._preorder(self.root)
+        elif order == "postorder":
+            return self._postorder(self.root)
+        else:
+            raise ValueError("Invalid traversal order. Choose 'inorder', 'preorder', or 'postorder'.")
+
+    # Generator for inorder traversal, using an explicit stack of indices
+    def _inorder(self, i):
+        values, left, right = self.values, self.left, self.right
+        stack = []
+        while stack or i != NIL:
+            while i != NIL:
+                stack.append(i)
+                i = left[i]
+            i = stack.pop()
+            yield values[i]
+            i = right[i]
+
+    # Generator for preorder traversal
+    def _preorder(self, i):
+        values, left, right = self.values, self.left, self.right
+        stack = [i] if i != NIL else []
+        while stack:
+            i = stack.pop()
+            yield values[i]
+            # Push right first so the left subtree comes out first
+            if right[i] != NIL:
+                stack.append(right[i])
+            if left[i] != NIL:
+                stack.append(left[i])
+
+    # Generator for postorder traversal
+    def _postorder(self, i):
+        values, left, right = self.values, self.left, self.right
+        stack = []
+        last_visited = NIL
+        while stack or i != NIL:
+            while i != NIL:
+                stack.append(i)
+                i = left[i]
+            top = stack[-1]
+            # Visit the right subtree first unless it is empty or was just finished
+            if right[top] != NIL and right[top] != last_visited:
+                i = right[top]
+            else:
+                stack.pop()
+                yield values[top]
+                last_visited = top
+
+    # Method to build a perfectly balanced tree from values in increasing order in O(n)
+    # Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable):
+        values = []
+        for value in iterable:
+            if values and value <= values[-1]:
+                if value == values[-1]:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {values[-1]}")
+            values.append(value)
+        tree = cls()
+        # Node k (1-based) holds values[k - 1], so the value array is filled in one go
+        tree.values.extend(values)
+        tree.left.extend(array('i', [NIL]) * len(values))
+        tree.right.extend(array('i', [NIL]) * len(values))
+        tree.heights.extend(array('b', [0]) * len(values))
+        tree.root = tree._build_balanced(1, len(values) + 1)
+        tree.size = len(values)
+        return tree
+
+    # Recursive method to link nodes low..high-1 into a balanced subtree, returning its root
+    def _build_balanced(self, low, high):
+        if low >= high:
+            return NIL
+        middle = (low + high) // 2
+        self.left[middle] = self._build_balanced(low, middle)
+        self.right[middle] = self._build_balanced(middle + 1, high)
+        self.heights[middle] = max(self.heights[self.left[middle]], self.heights[self.right[middle]]) + 1
+        return middle
+
+    # Method to remove every value at once by starting over with empty arrays
+    def clear(self):
+        self.__init__()
+
+    # Method to return a new tree holding the values of this tree and another one
+    # Both inorder sequences are merged in one pass and the result is built with from_sorted, so it takes O(n + m)
+    def merge(self, other):
+        return type(self).from_sorted(merge_sorted(self, other))
+
+    # Method to check the AVL invariants: keys in order, stored heights correct, balance within 1, size correct
+    # Raises AssertionError at the first broken node and returns the tree height otherwise
+    def check_invariants(self):
+        height, count = self._check_rec(self.root, None, None)
+        if count != self.size:
+            raise AssertionError(f"Tree holds {count} values but its size is {self.size}")
+        return height
+
+    # Recursive method to check the subtree at index i, returning its height and number of nodes
+    def _check_rec(self, i, low, high):
+        if i == NIL:
+            return 0, 0
+        value = self.values[i]
+        if (low is not None and value <= low) or (high is not None and value >= high):
+            raise AssertionError(f"{value} is out of order (must be between {low} and {high})")
+        left_height, left_count = self._check_rec(self.left[i], low, value)
+        right_height, right_count = self._check_rec(self.right[i], value, high)
+        if self.heights[i] != max(left_height, right_height) + 1:
+            raise AssertionError(f"Node {value} stores height {self.heights[i]}, actual {max(left_height, right_height) + 1}")
+        if abs(left_height - right_height) > 1:
+            raise AssertionError(f"Node {value} has balance {left_height - right_height}")
+        return self.heights[i], left_count + right_count + 1
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to build a tree from a list of values, measuring the memory it keeps (not counting the values themselves)
+def measure_memory(tree_class, values):
+    gc.collect()
+    tracemalloc.start()
+    tree = tree_class()
+    for x in values:
+        tree.insert(x)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tree, memory
+
+# Function to compare bytes per key and insert time of the node-object AVL tree and the array-backed one
+def compare_trees(size):
+    values = random.sample(range(size * 10), size)
+    print(f"{size} keys:")
+    for name, tree_class in (("Node objects", BinarySearchTree), ("Array pool", CompactAVLTree)):
+        tree, memory = measure_memory(tree_class, values)
+        perf_time_delete = measure_time(lambda: [tree.delete(x) for x in values])
+        perf_time_insert = measure_time(lambda: [tree.insert(x) for x in values])
+        print(f"  {name:<13} {memory / size:8.1f} bytes per key, "
+              f"delete all: {perf_time_delete:.4f} seconds, insert all: {perf_time_insert:.4f} seconds")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        compare_trees(size)
@@ -0,0 +1,194 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Persistent self-balancing binary search tree - updates copy the path instead of changing nodes
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import sys, random, threading, time
+from Self_Balancing import BinarySearchTree, Node
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Persistent AVL tree class - same API as Self_Balancing.BinarySearchTree, including the order statistics
+# A node is never changed once it is in a tree: insert and delete build new nodes along the path they
+# walk (O(log n) of them, rotations included) and share every other subtree with the old version,
+# then publish the new root with a single assignment. Anyone holding an old root keeps a complete,
+# unchanging tree, so readers take a snapshot() and query it without a lock while one writer updates
+# The queries are inherited: they only read nodes, and each starts from the root it read once
+class PersistentAVLTree(BinarySearchTree):
+
+    # Method to insert a value - returns the new root, which shares all but one path with the old one
+    def insert(self, value):
+        root = self._insert_rec(self.root, value)
+        self._publish(root)
+        return root
+
+    # Recursive method returning a copy of the subtree with value added, or the same subtree if it is already there
+    def _insert_rec(self, node, value):
+        if node is None:
+            return self._make(value, None, None)
+
+        # Less goes left, greater goes right
+        if value < node.value:
+            left = self._insert_rec(node.left, value)
+            if left is node.left:
+                return node  # Duplicate values not allowed - nothing copied
+            return self._make_balanced(node.value, left, node.right)
+        elif value > node.value:
+            right = self._insert_rec(node.right, value)
+            if right is node.right:
+                return node
+            return self._make_balanced(node.value, node.left, right)
+        return node
+
+    # Method to delete a value - returns the new root, or the old one if the value is not in the tree
+    def delete(self, value):
+        root = self._delete_rec(self.root, value)
+        self._publish(root)
+        return root
+
+    # Recursive method returning a copy of the subtree without value, or the same subtree if value is not in it
+    def _delete_rec(self, node, value):
+        # Value not in the tree - Base Case
+        if node is None:
+            return None
+
+        if value < node.value:
+            left = self._delete_rec(node.left, value)
+            if left is node.left:
+                return node
+            return self._make_balanced(node.value, left, node.right)
+        elif value > node.value:
+            right = self._delete_rec(node.right, value)
+            if right is node.right:
+                return node
+            return self._make_balanced(node.value, node.left, right)
+
+        # Case 1: No child or one child - the other subtree takes the node's place as it is
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        # Case 2: Two children - a new node holding the inorder successor replaces this one
+        successor = self._find_min(node.right).value
+        return self._make_balanced(successor, node.left, self._delete_rec(node.right, successor))
+
+    # Method to make the new root the current version
+    # The root goes first: a snapshot takes its size from the root, never from self.size
+    def _publish(self, root):
+        self.root = root
+        self.size = self.get_count(root)
+
+    # Method to return a read-only view of the tree as it is now, in O(1)
+    # Later inserts and deletes on this tree don't show up in the snapshot, and it needs no lock to read
+    def snapshot(self):
+        root = self.root
+        view = type(self)()
+        view.root = root
+        view.size = self.get_count(root)
+        return view
+
+    # Method to create a node over two existing subtrees, with its height and subtree size
+    def _make(self, value, left, right):
+        node = Node(value)
+        node.left = left
+        node.right = right
+        node.height = max(self.get_height(left), self.get_height(right)) + 1
+        node.count = self.get_count(left) + self.get_count(right) + 1
+        return node
+
+    # Method to create a node over two subtrees whose heights may differ by 2, rotating as it goes
+    # The rotations build new nodes for the ones that move and leave the shared subtrees untouched
+    def _make_balanced(self, value, left, right):
+        left_height, right_height = self.get_height(left), self.get_height(right)
+
+        # Left heavy
+        if left_height > right_height + 1:
+            # Left Right Case
+            if self.get_height(left.left) < self.get_height(left.right):
+                inner = left.right
+                return self._make(inner.value, self._make(left.value, left.left, inner.left),
+                                  self._make(value, inner.right, right))
+            # Left Left Case
+            return self._make(left.value, left.left, self._make(value, left.right, right))
+
+        # Right heavy
+        if right_height > left_height + 1:
+            # Right Left Case
+            if self.get_height(right.right) < self.get_height(right.left):
+                inner = right.left
+                return self._make(inner.value, self._make(value, left, inner.left),
+                                  self._make(right.value, inner.right, right.right))
+            # Right Right Case
+            return self._make(right.value, self._make(value, left, right.left), right.right)
+
+        return self._make(value, left, right)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to run range-query readers on threads next to one writer for a number of seconds
+# The writer toggles random values in and out of the tree; each reader counts the range queries it
+# completes, each one listing about range_width values. With a lock, readers and writer take turns
+# on the mutable tree; without one, each reader queries a snapshot of the persistent tree
+# Returns (range queries per second, values read per second, writes per second)
+def run_concurrent(tree, locked, size, readers=4, seconds=1.0, range_width=100, seed=0):
+    lock = threading.Lock()
+    stop = threading.Event()
+    reads = [0] * readers
+    values_read = [0] * readers
+    writes = [0]
+
+    def reader(i):
+        rng = random.Random(seed + i + 1)
+        while not stop.is_set():
+            lo = rng.randrange(2 * size)
+            if locked:
+                with lock:
+                    found = len(list(tree.iter_range(lo, lo + 2 * range_width)))
+            else:
+                found = len(list(tree.snapshot().iter_range(lo, lo + 2 * range_width)))
+            reads[i] += 1
+            values_read[i] += found
+
+    def writer():
+        rng = random.Random(seed)
+        present = set(range(0, 2 * size, 2))
+        while not stop.is_set():
+            x = rng.randrange(2 * size)
+            update = tree.delete if x in present else tree.insert
+            if locked:
+                with lock:
+                    update(x)
+            else:
+                update(x)
+            present ^= {x}
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    return sum(reads) / elapsed, sum(values_read) / elapsed, writes[0] / elapsed
+
+# Function to compare the locked mutable AVL tree with lock-free snapshots of the persistent one
+# Both start from the same size values (the even numbers below 2 * size) and run the same workload
+def compare_concurrency(size, readers=4, seconds=1.0, range_width=100):
+    values = range(0, 2 * size, 2)
+    print(f"{size} keys, {readers} readers and 1 writer for {seconds} s, ranges of about {range_width} values:")
+    for name, tree_class, locked in (("Locked AVL", BinarySearchTree, True),
+                                     ("Persistent", PersistentAVLTree, False)):
+        tree = tree_class.from_sorted(values)
+        queries, read_rate, write_rate = run_concurrent(tree, locked, size, readers, seconds, range_width)
+        tree.check_invariants()
+        print(f"  {name:<11} {queries:10.0f} range queries/s ({read_rate:10.0f} values/s), {write_rate:8.0f} writes/s")
+
+# Usage: python Persistent_AVL.py [sizes...]
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        compare_concurrency(size)
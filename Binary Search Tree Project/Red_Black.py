@@ -0,0 +1,384 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Project demonstrating a red-black tree
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import sys
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Node class
+class Node:
+    __slots__ = ("value", "left", "right", "parent", "red")
+
+    def __init__(self, value, nil=None, red=True):
+        self.value = value
+        self.left = nil
+        self.right = nil
+        self.parent = nil
+        self.red = red  # New nodes start red
+
+
+# Red-black tree class - same interface as the BinarySearchTree classes
+# Every path from a node down to an empty subtree has the same number of black nodes and no red node
+# has a red child, so the tree is at most 2 * log2(n + 1) tall. It rotates less than an AVL tree
+# (at most 2 rotations per insert, 3 per delete) at the cost of a slightly taller tree
+class RedBlackTree:
+    # Constructor
+    def __init__(self):
+        # Shared black sentinel standing in for every empty subtree (and the root's parent)
+        self.nil = Node(None, red=False)
+        self.nil.left = self.nil.right = self.nil.parent = self.nil
+        self.root = self.nil
+        self.size = 0
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder(self.root)
+
+    # Method to insert a value into the tree
+    def insert(self, value):
+        nil = self.nil
+        parent = nil
+        current = self.root
+        while current is not nil:
+            parent = current
+            if value < current.value:
+                current = current.left
+            elif value > current.value:
+                current = current.right
+            else:
+                return  # Duplicate values not allowed
+
+        node = Node(value, nil)
+        node.parent = parent
+        if parent is nil:
+            self.root = node
+        elif value < parent.value:
+            parent.left = node
+        else:
+            parent.right = node
+        self.size += 1
+        self._insert_fixup(node)
+
+    # Method to restore the red-black rules after inserting a red node
+    def _insert_fixup(self, node):
+        while node.parent.red:
+            parent = node.parent
+            grandparent = parent.parent
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                # Case 1: red uncle - recolor and move the problem up two levels
+                if uncle.red:
+                    parent.red = uncle.red = False
+                    grandparent.red = True
+                    node = grandparent
+                    continue
+                # Case 2: node is an inner child - rotate it to the outside
+                if node is parent.right:
+                    node = parent
+                    self._left_rotate(node)
+                    parent = node.parent
+                # Case 3: node is an outer child - rotate the grandparent
+                parent.red = False
+                grandparent.red = True
+                self._right_rotate(grandparent)
+            else:
+                uncle = grandparent.left
+                if uncle.red:
+                    parent.red = uncle.red = False
+                    grandparent.red = True
+                    node = grandparent
+                    continue
+                if node is parent.left:
+                    node = parent
+                    self._right_rotate(node)
+                    parent = node.parent
+                parent.red = False
+                grandparent.red = True
+                self._left_rotate(grandparent)
+        self.root.red = False
+
+    # Method to delete a value from the tree
+    def delete(self, value):
+        nil = self.nil
+        node = self.root
+        while node is not nil and node.value != value:
+            node = node.left if value < node.value else node.right
+        # Value not in the tree
+        if node is nil:
+            return
+
+        # removed is the node that actually leaves the tree; child takes its place
+        removed = node
+        removed_red = removed.red
+        if node.left is nil:
+            child = node.right
+            self._transplant(node, child)
+        elif node.right is nil:
+            child = node.left
+            self._transplant(node, child)
+        else:
+            # Two children - the inorder successor takes the node's place
+            removed = self._find_min(node.right)
+            removed_red = removed.red
+            child = removed.right
+            if removed.parent is node:
+                child.parent = removed
+            else:
+                self._transplant(removed, removed.right)
+                removed.right = node.right
+                removed.right.parent = removed
+            self._transplant(node, removed)
+            removed.left = node.left
+            removed.left.parent = removed
+            removed.red = node.red
+        self.size -= 1
+
+        # Removing a black node leaves one path short of a black node
+        if not removed_red:
+            self._delete_fixup(child)
+        # Leave the sentinel as it was for the next operation
+        nil.parent = nil
+
+    # Method to push a missing black up the tree until it can be absorbed
+    def _delete_fixup(self, node):
+        while node is not self.root and not node.red:
+            parent = node.parent
+            if node is parent.left:
+                sibling = parent.right
+                # Case 1: red sibling - rotate so the sibling is black
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self._left_rotate(parent)
+                    sibling = parent.right
+                # Case 2: sibling with two black children - recolor and move up
+                if not sibling.left.red and not sibling.right.red:
+                    sibling.red = True
+                    node = parent
+                    continue
+                # Case 3: sibling's far child is black - rotate the near red child outwards
+                if not sibling.right.red:
+                    sibling.left.red = False
+                    sibling.red = True
+                    self._right_rotate(sibling)
+                    sibling = parent.right
+                # Case 4: sibling's far child is red - rotate the parent and finish
+                sibling.red = parent.red
+                parent.red = False
+                sibling.right.red = False
+                self._left_rotate(parent)
+                node = self.root
+            else:
+                sibling = parent.left
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self._right_rotate(parent)
+                    sibling = parent.left
+                if not sibling.left.red and not sibling.right.red:
+                    sibling.red = True
+                    node = parent
+                    continue
+                if not sibling.left.red:
+                    sibling.right.red = False
+                    sibling.red = True
+                    self._left_rotate(sibling)
+                    sibling = parent.left
+                sibling.red = parent.red
+                parent.red = False
+                sibling.left.red = False
+                self._right_rotate(parent)
+                node = self.root
+        node.red = False
+
+    # Method to put the subtree at new in old's place under old's parent
+    def _transplant(self, old, new):
+        if old.parent is self.nil:
+            self.root = new
+        elif old is old.parent.left:
+            old.parent.left = new
+        else:
+            old.parent.right = new
+        new.parent = old.parent
+
+    # Helper method for left rotation
+    def _left_rotate(self, x):
+        y = x.right
+        x.right = y.left
+        if y.left is not self.nil:
+            y.left.parent = x
+        self._transplant(x, y)
+        y.left = x
+        x.parent = y
+
+    # Helper method for right rotation
+    def _right_rotate(self, y):
+        x = y.left
+        y.left = x.right
+        if x.right is not self.nil:
+            x.right.parent = y
+        self._transplant(y, x)
+        x.right = y
+        y.parent = x
+
+    # Method to find the minimum value node in a subtree
+    def _find_min(self, node):
+        while node.left is not self.nil:
+            node = node.left
+        return node
+
+    # Method to find the maximum value in the tree - the rightmost node
+    def maximum(self):
+        if self.root is self.nil:
+            return None
+        node = self.root
+        while node.right is not self.nil:
+            node = node.right
+        return node.value
+
+    # Method to traverse the tree in a specific order - default to inorder traversal
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
+    def traverse(self, order="inorder"):
+        result = [None] * self.size
+        i = 0
+        for value in self.iter_traverse(order):
+            result[i] = value
+            i += 1
+        return result
+
+    # Method to return a lazy iterator over the tree in a specific order
+    def iter_traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._inorder(self.root)
+        elif order == "preorder":
+            return self._preorder(self.root)
+        elif order == "postorder":
+            return self._postorder(self.root)
+        else:
+            raise ValueError("Invalid traversal order. Choose 'inorder', 'preorder', or 'postorder'.")
+
+    # Generator for inorder traversal, using an explicit stack instead of recursion
+    def _inorder(self, node):
+        nil = self.nil
+        stack = []
+        while stack or node is not nil:
+            while node is not nil:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    # Generator for preorder traversal
+    def _preorder(self, node):
+        nil = self.nil
+        stack = [node] if node is not nil else []
+        while stack:
+            node = stack.pop()
+            yield node.value
+            # Push right first so the left subtree comes out first
+            if node.right is not nil:
+                stack.append(node.right)
+            if node.left is not nil:
+                stack.append(node.left)
+
+    # Generator for postorder traversal
+    def _postorder(self, node):
+        nil = self.nil
+        stack = []
+        last_visited = None
+        while stack or node is not nil:
+            while node is not nil:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            # Visit the right subtree first unless it is empty or was just finished
+            if top.right is not nil and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                yield top.value
+                last_visited = top
+
+    # Method to build a balanced tree from values in increasing order in O(n)
+    # Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable):
+        values = []
+        for value in iterable:
+            if values and value <= values[-1]:
+                if value == values[-1]:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {values[-1]}")
+            values.append(value)
+        tree = cls()
+        # Every leaf of the middle-split tree is at depth full or full - 1; coloring the nodes on the
+        # partly filled bottom level red keeps the number of black nodes equal on every path
+        full = (len(values) + 1).bit_length() - 1
+        tree.root = tree._build_balanced(values, 0, len(values), 0, full, tree.nil)
+        tree.size = len(values)
+        return tree
+
+    # Recursive method to build a balanced subtree from values[low:high] - the middle value becomes the root
+    def _build_balanced(self, values, low, high, depth, full, parent):
+        if low >= high:
+            return self.nil
+        middle = (low + high) // 2
+        node = Node(values[middle], self.nil, red=(depth == full))
+        node.parent = parent
+        node.left = self._build_balanced(values, low, middle, depth + 1, full, node)
+        node.right = self._build_balanced(values, middle + 1, high, depth + 1, full, node)
+        return node
+
+    # Method to remove every value at once
+    def clear(self):
+        self.root = self.nil
+        self.size = 0
+
+    # Method to check the red-black rules: keys in order, parent links right, no red node with a red
+    # child, the same number of black nodes on every path, and the size correct
+    # Raises AssertionError at the first broken node and returns the tree height otherwise
+    def check_invariants(self):
+        nil = self.nil
+        if self.root.red:
+            raise AssertionError("The root is red")
+        count = 0
+        height = 0
+        black_height = None
+        # (node, lower bound, upper bound, depth, black nodes above and including this one)
+        stack = [(self.root, None, None, 1, 0)] if self.root is not nil else []
+        while stack:
+            node, low, high, depth, blacks = stack.pop()
+            count += 1
+            height = max(height, depth)
+            if (low is not None and node.value <= low) or (high is not None and node.value >= high):
+                raise AssertionError(f"{node.value} is out of order (must be between {low} and {high})")
+            if node.red and (node.left.red or node.right.red):
+                raise AssertionError(f"Red node {node.value} has a red child")
+            blacks += not node.red
+            for child, child_low, child_high in ((node.left, low, node.value), (node.right, node.value, high)):
+                if child is nil:
+                    if black_height is None:
+                        black_height = blacks
+                    elif blacks != black_height:
+                        raise AssertionError(f"Path below {node.value} has {blacks} black nodes, others {black_height}")
+                else:
+                    if child.parent is not node:
+                        raise AssertionError(f"Node {child.value} has the wrong parent")
+                    stack.append((child, child_low, child_high, depth + 1, blacks))
+        if count != self.size:
+            raise AssertionError(f"Tree holds {count} values but its size is {self.size}")
+        return height
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Usage: python Red_Black.py [benchmark options], e.g. python Red_Black.py --sizes 10000 100000 --distributions sorted zipfian
+if __name__ == "__main__":
+    from benchmark import main
+    main(sys.argv[1:], default_engines=("redblack",))
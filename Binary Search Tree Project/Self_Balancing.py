@@ -4,35 +4,55 @@
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Libraries
-import csv, time, random
+import csv, time, random, sys
+from key_file import write_keys, read_keys
+from sorted_tree import SortedTreeMixin
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # Node class
 class Node:
+    # Fixed attributes instead of a per-node __dict__, which saves about 100 bytes per node
+    __slots__ = ("value", "left", "right", "height", "count")
+
     def __init__(self, value):
         self.value = value
         self.left = None
         self.right = None
         self.height = 1  # Add height property
+        self.count = 1  # Number of nodes in the subtree rooted here, for rank and select
 
 
 # Binary Search Tree class
-class BinarySearchTree:
+class BinarySearchTree(SortedTreeMixin):
+    node_class = Node
 
     # Constructor
     def __init__(self):
         self.root = None
+        # Number of values in the tree, so traverse() can allocate its result list once
+        self.size = 0
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder(self.root)
 
     # Method to insert a value into the tree
     def insert(self, value):
         if self.root is None:
             self.root = Node(value)
+            self.size += 1
         else:
-            self._insert_rec(self.root, value)
+            # Keep the returned node - a rotation at the root replaces it
+            self.root = self._insert_rec(self.root, value)
 
     # Recursive method to insert a value into the tree
     def _insert_rec(self, node, value):
         if not node:
+            self.size += 1
             return Node(value)
         
         # Less goes left, greater goes right
@@ -43,8 +63,9 @@ class BinarySearchTree:
         else:
             return node  # Duplicate values not allowed
 
-        # Update height
+        # Update height and subtree size
         node.height = max(self.get_height(node.left), self.get_height(node.right)) + 1
+        node.count = self.get_count(node.left) + self.get_count(node.right) + 1
 
         # Get balance factor
         balance = self.get_balance(node)
@@ -88,6 +109,8 @@ class BinarySearchTree:
             current.right = self._delete_rec(current.right, value)
         else:
             # Case 1: No child or one child
+            if current.left is None or current.right is None:
+                self.size -= 1
             if current.left is None:
                 # Replace the node with its right child
                 return current.right
@@ -100,7 +123,33 @@ class BinarySearchTree:
             # Delete the inorder successor
             current.right = self._delete_rec(current.right, current.value)
 
-        return current
+        # Update the height and rotate on the way back up, as insert does
+        return self._rebalance(current)
+
+    # Method to restore the AVL balance of a node whose subtrees may differ in height by 2
+    # Unlike insert, delete can't tell the case from the value, so it looks at the child's balance
+    def _rebalance(self, node):
+        node.height = max(self.get_height(node.left), self.get_height(node.right)) + 1
+        node.count = self.get_count(node.left) + self.get_count(node.right) + 1
+        balance = self.get_balance(node)
+
+        # Left heavy
+        if balance > 1:
+            # Left Right Case
+            if self.get_balance(node.left) < 0:
+                node.left = self.left_rotate(node.left)
+            # Left Left Case
+            return self.right_rotate(node)
+
+        # Right heavy
+        if balance < -1:
+            # Right Left Case
+            if self.get_balance(node.right) > 0:
+                node.right = self.right_rotate(node.right)
+            # Right Right Case
+            return self.left_rotate(node)
+
+        return node
 
     # Method to find the minimum value node in the tree
     def _find_min(self, node):
@@ -123,8 +172,87 @@ class BinarySearchTree:
             current = current.right
         return current.value
 
+    # Method to find the minimum value in the tree - the leftmost node
+    def minimum(self):
+        if self.root is None:
+            return None
+        return self._find_min(self.root).value
+
+    # Method to count the values smaller than x (x itself need not be in the tree)
+    def rank(self, x):
+        return self._rank(x, False)
+
+    # Method to count the values smaller than x, or smaller than or equal to x when inclusive
+    # Every node passed on the way down to the right adds its left subtree plus itself
+    def _rank(self, x, inclusive):
+        count = 0
+        current = self.root
+        while current is not None:
+            if x < current.value or (x == current.value and not inclusive):
+                current = current.left
+            else:
+                count += self.get_count(current.left) + 1
+                current = current.right
+        return count
+
+    # Method to return the k-th smallest value, counting from 0 (so select(0) is the minimum)
+    def select(self, k):
+        if k < 0 or k >= self.size:
+            raise IndexError(f"select({k}) is out of range for a tree of {self.size} values")
+        current = self.root
+        while True:
+            left_count = self.get_count(current.left)
+            if k < left_count:
+                current = current.left
+            elif k == left_count:
+                return current.value
+            else:
+                k -= left_count + 1
+                current = current.right
+
+    # Method to count the values between lo and hi, both included
+    def count_range(self, lo, hi):
+        if hi < lo:
+            return 0
+        return self._rank(hi, True) - self._rank(lo, False)
+
+    # Method to find the largest value less than or equal to x - returns None if there is none
+    def floor(self, x):
+        best = None
+        current = self.root
+        while current is not None:
+            if x < current.value:
+                current = current.left
+            elif x > current.value:
+                best = current.value
+                current = current.right
+            else:
+                return current.value
+        return best
+
+    # Method to find the smallest value greater than or equal to x - returns None if there is none
+    def ceiling(self, x):
+        best = None
+        current = self.root
+        while current is not None:
+            if x > current.value:
+                current = current.right
+            elif x < current.value:
+                best = current.value
+                current = current.left
+            else:
+                return current.value
+        return best
+
     # Method to traverse the tree in a specific order - default to inorder traversal
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
     def traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._fill_inorder(self.root)
+        return self._fill(self.iter_traverse(order))
+
+    # Method to return a lazy iterator over the tree in a specific order
+    def iter_traverse(self, order="inorder"):
         if order == "inorder":
             return self._inorder(self.root)
         elif order == "preorder":
@@ -134,32 +262,125 @@ class BinarySearchTree:
         else:
             raise ValueError("Invalid traversal order. Choose 'inorder', 'preorder', or 'postorder'.")
 
-    # Recursive method for inorder traversal
-    def _inorder(self, node):
-        result = []
-        if node:
-            result += self._inorder(node.left)
-            result.append(node.value)
-            result += self._inorder(node.right)
+    # Method to copy values into one list allocated up front at the tree's size
+    def _fill(self, values):
+        result = [None] * self.size
+        i = 0
+        for value in values:
+            result[i] = value
+            i += 1
         return result
 
-    # Recursive method for preorder traversal
+    # Inorder traversal written straight into a preallocated list, without the generator in between
+    def _fill_inorder(self, node):
+        result = [None] * self.size
+        i = 0
+        stack = []
+        while True:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return result
+            node = stack.pop()
+            result[i] = node.value
+            i += 1
+            node = node.right
+
+    # Generator for inorder traversal, using an explicit stack instead of recursion
+    def _inorder(self, node):
+        stack = []
+        while stack or node:
+            # Go as far left as possible, remembering the path
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    # Generator for preorder traversal
     def _preorder(self, node):
-        result = []
-        if node:
-            result.append(node.value)
-            result += self._preorder(node.left)
-            result += self._preorder(node.right)
-        return result
-
-    # Recursive method for postorder traversal
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            yield node.value
+            # Push right first so the left subtree comes out first
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+    # Generator for postorder traversal
     def _postorder(self, node):
-        result = []
-        if node:
-            result += self._postorder(node.left)
-            result += self._postorder(node.right)
-            result.append(node.value)
-        return result
+        stack = []
+        last_visited = None
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            # Visit the right subtree first unless it is empty or was just finished
+            if top.right and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                yield top.value
+                last_visited = top
+
+    # Method to save the values to a key file: a small header, then the sorted values packed as 64-bit integers
+    def dump(self, path):
+        return write_keys(path, self._inorder(self.root))
+
+    # Method to rebuild a tree saved by dump() - one read into an array, then a balanced build in O(n)
+    # The file is already sorted, so the values skip the order checks from_sorted makes
+    # (key_file.MappedSortedKeys serves lookups from the file without building a tree at all)
+    @classmethod
+    def load(cls, path):
+        keys = read_keys(path)
+        tree = cls()
+        tree.root = tree._build_balanced(keys, 0, len(keys))
+        tree.size = len(keys)
+        return tree
+
+    # Method to fill in the height and subtree size of a node built by _build_balanced
+    def _finish_built_node(self, node, count):
+        node.height = max(self.get_height(node.left), self.get_height(node.right)) + 1
+        node.count = count
+
+    # Method to check the AVL invariants: keys in order, stored heights and subtree sizes correct, balance within 1
+    # Raises AssertionError at the first broken node and returns the tree height otherwise
+    def check_invariants(self):
+        count = 0
+        # Postorder with an explicit stack: (node, lower bound, upper bound, children done)
+        stack = [(self.root, None, None, False)] if self.root else []
+        heights = {}
+        counts = {}
+        while stack:
+            node, low, high, done = stack.pop()
+            if not done:
+                if (low is not None and node.value <= low) or (high is not None and node.value >= high):
+                    raise AssertionError(f"{node.value} is out of order (must be between {low} and {high})")
+                stack.append((node, low, high, True))
+                if node.left:
+                    stack.append((node.left, low, node.value, False))
+                if node.right:
+                    stack.append((node.right, node.value, high, False))
+                continue
+            count += 1
+            left, right = heights.pop(id(node.left), 0), heights.pop(id(node.right), 0)
+            if node.height != max(left, right) + 1:
+                raise AssertionError(f"Node {node.value} stores height {node.height}, actual {max(left, right) + 1}")
+            if abs(left - right) > 1:
+                raise AssertionError(f"Node {node.value} has balance {left - right}")
+            subtree = counts.pop(id(node.left), 0) + counts.pop(id(node.right), 0) + 1
+            if node.count != subtree:
+                raise AssertionError(f"Node {node.value} stores subtree size {node.count}, actual {subtree}")
+            heights[id(node)] = node.height
+            counts[id(node)] = node.count
+        if count != self.size:
+            raise AssertionError(f"Tree holds {count} values but its size is {self.size}")
+        return self.get_height(self.root)
 
     # Method to get the height of a node
     def get_height(self, node):
@@ -167,6 +388,12 @@ class BinarySearchTree:
             return 0
         return node.height
 
+    # Method to get the number of nodes in a subtree
+    def get_count(self, node):
+        if not node:
+            return 0
+        return node.count
+
     # Method to get the balance factor of a node
     def get_balance(self, node):
         if not node:
@@ -182,9 +409,11 @@ class BinarySearchTree:
         x.right = y
         y.left = T2
 
-        # Update heights
+        # Update heights and subtree sizes
         y.height = max(self.get_height(y.left), self.get_height(y.right)) + 1
         x.height = max(self.get_height(x.left), self.get_height(x.right)) + 1
+        x.count = y.count
+        y.count = self.get_count(y.left) + self.get_count(y.right) + 1
         return x
 
     # Helper method for left rotation
@@ -196,9 +425,11 @@ class BinarySearchTree:
         y.left = x
         x.right = T2
 
-        # Update heights
+        # Update heights and subtree sizes
         x.height = max(self.get_height(x.left), self.get_height(x.right)) + 1
         y.height = max(self.get_height(y.left), self.get_height(y.right)) + 1
+        y.count = x.count
+        x.count = self.get_count(x.left) + self.get_count(x.right) + 1
         return y
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
@@ -230,76 +461,15 @@ def measure_time(func, *args, **kwargs):
     execution_time = end_time - start_time
     return execution_time
 
-# Function to write performance results to a CSV file
-def save_performance_to_csv(results, filename="AVLperformance_results.csv"):
-    with open(filename, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        # Write headers if the file is empty
-        file.seek(0, 2)  # Move to the end of the file
-        if file.tell() == 0:
-            writer.writerow(["Size", "Operation", "Time"])
-        
-        # Write the results
-        for result in results:
-            writer.writerow(result)
-
-# Function to test AVL tree operations
-def test_avl_operations(avl, shuffled_integers, size):
-    # Initialize a list to store the results from each operation
-    results = []
-    
-    # Insertion
-    perf_time_insert = measure_time(lambda: [avl.insert(x) for x in shuffled_integers])
-    results.append([size, "Insert", f"{perf_time_insert:.8f}"])
-
-    # Find Maximum
-    perf_time_max = measure_time(avl.maximum)
-    results.append([size, "Max", f"{perf_time_max:.8f}"])
-
-    # Traverse tree inorder
-    perf_time_traverse = measure_time(avl.traverse)
-    results.append([size, "Traverse", f"{perf_time_traverse:.8f}"])
-
-    # Delete all nodes
-    perf_time_delete = measure_time(delete_all_nodes, avl)
-    results.append([size, "Delete", f"{perf_time_delete:.8f}"])
-
-    return results
-
-# Function to delete all nodes in the AVL tree
-def delete_all_nodes(avl):
-    while avl.root is not None:
-        avl.delete(avl.root.value)
+# Function to run the benchmark for one engine (see engines.py) at each size and save the labeled results (see benchmark.py)
+def run_tests(engine="avl", sizes=None, distributions=("shuffled",), trials=3):
+    # Imported here because benchmark.py imports the engines, and so this module
+    from benchmark import run_tests as run_benchmark
+    return run_benchmark(engine, sizes, distributions, trials)
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-def run_tests():
-    test_files = {
-        100: "Binary Search Tree Project\\test100.csv",
-        1000: "Binary Search Tree Project\\test1000.csv",
-        10000: "Binary Search Tree Project\\test10000.csv",
-        100000: "Binary Search Tree Project\\test100000.csv"
-    }
-
-    # Run tests for each size and save the results to a CSV file
-    all_results = []
-    for size, test_file in test_files.items():
-        #  Read the integers from the CSV file and shuffle them
-        integers = read_csv(test_file)
-        shuffled_integers = shuffle_array(integers)
-        # Create an AVL tree and test its operations
-        avl = BinarySearchTree()
-        results = test_avl_operations(avl, shuffled_integers, size)
-        all_results.extend(results)
-
-    # Save the results to a CSV file
-    save_performance_to_csv(all_results)
 
+# Usage: python Self_Balancing.py [benchmark options], e.g. python Self_Balancing.py --engines avl redblack --sizes 10000 100000
 if __name__ == "__main__":
-    run_tests()
-
-
-
-
-
-
-
+    import benchmark
+    benchmark.main(sys.argv[1:], default_engines=("avl",))
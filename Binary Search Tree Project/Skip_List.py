@@ -0,0 +1,182 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Project demonstrating a skip list as an ordered set
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import sys, random
+
+# Highest level a node can reach - enough for 2 ** 32 values with PROMOTE = 0.5
+MAX_LEVEL = 32
+# Chance that a node on one level is also linked into the level above
+PROMOTE = 0.5
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Node class - forward[i] is the next node on level i
+class Node:
+    __slots__ = ("value", "forward")
+
+    def __init__(self, value, level):
+        self.value = value
+        self.forward = [None] * level
+
+
+# Skip list class - same interface as the BinarySearchTree classes
+# A sorted linked list with express lanes: level 0 links every value, and each level above skips about
+# half of the one below, so a search drops down through O(log n) levels with a few steps on each
+# There is no tree, so traverse() only supports inorder
+class SkipList:
+    # Constructor - seed makes the levels, and so the list's shape, repeatable
+    def __init__(self, seed=None):
+        self.head = Node(None, MAX_LEVEL)
+        self.level = 1  # Number of levels in use
+        self.size = 0
+        self.random = random.Random(seed)
+
+    # Method to report the number of values in the list
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder()
+
+    # Method to pick a level for a new node: 1, then one more for every successful coin flip
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and self.random.random() < PROMOTE:
+            level += 1
+        return level
+
+    # Method to find, on every level, the last node before value
+    def _predecessors(self, value):
+        update = [self.head] * MAX_LEVEL
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].value < value:
+                node = node.forward[i]
+            update[i] = node
+        return update
+
+    # Method to insert a value into the list
+    def insert(self, value):
+        update = self._predecessors(value)
+        after = update[0].forward[0]
+        if after is not None and after.value == value:
+            return  # Duplicate values not allowed
+
+        level = self._random_level()
+        if level > self.level:
+            # update already points at the head on the new levels
+            self.level = level
+        node = Node(value, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+        self.size += 1
+
+    # Method to delete a value from the list
+    def delete(self, value):
+        update = self._predecessors(value)
+        node = update[0].forward[0]
+        # Value not in the list
+        if node is None or node.value != value:
+            return
+
+        for i in range(len(node.forward)):
+            update[i].forward[i] = node.forward[i]
+        self.size -= 1
+        # Drop levels that are now empty
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+
+    # Method to find the maximum value - follow the top level as far as it goes, then drop down
+    def maximum(self):
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while node.forward[i] is not None:
+                node = node.forward[i]
+        return node.value
+
+    # Method to traverse the list in sorted order
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
+    def traverse(self, order="inorder"):
+        result = [None] * self.size
+        i = 0
+        for value in self.iter_traverse(order):
+            result[i] = value
+            i += 1
+        return result
+
+    # Method to return a lazy iterator over the values in sorted order
+    def iter_traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._inorder()
+        raise ValueError("A skip list has no tree shape, so 'inorder' is the only traversal order.")
+
+    # Generator walking level 0 from the start
+    def _inorder(self):
+        node = self.head.forward[0]
+        while node is not None:
+            yield node.value
+            node = node.forward[0]
+
+    # Method to build a list from values in increasing order in O(n) by appending to the end of every level
+    # Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable, seed=None):
+        skip_list = cls(seed)
+        # Last node on each level so far
+        tails = [skip_list.head] * MAX_LEVEL
+        last = None
+        for value in iterable:
+            if skip_list.size and value <= last:
+                if value == last:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {last}")
+            level = skip_list._random_level()
+            skip_list.level = max(skip_list.level, level)
+            node = Node(value, level)
+            for i in range(level):
+                tails[i].forward[i] = node
+                tails[i] = node
+            last = value
+            skip_list.size += 1
+        return skip_list
+
+    # Method to remove every value at once
+    def clear(self):
+        self.head = Node(None, MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    # Method to check the skip list rules: every level sorted, every node on a level also on the level
+    # below, no links above the levels in use, and the size correct
+    # Raises AssertionError at the first problem and returns the number of levels otherwise
+    def check_invariants(self):
+        below = None
+        for i in range(self.level):
+            on_level = []
+            node = self.head.forward[i]
+            while node is not None:
+                if on_level and node.value <= on_level[-1].value:
+                    raise AssertionError(f"Level {i} is out of order at {node.value}")
+                if len(node.forward) <= i:
+                    raise AssertionError(f"Node {node.value} is linked on level {i} above its height")
+                on_level.append(node)
+                node = node.forward[i]
+            if below is not None and not {id(node) for node in on_level} <= below:
+                raise AssertionError(f"Level {i} links a node that is missing from level {i - 1}")
+            if i == 0 and len(on_level) != self.size:
+                raise AssertionError(f"List holds {len(on_level)} values but its size is {self.size}")
+            below = {id(node) for node in on_level}
+        if any(self.head.forward[i] is not None for i in range(self.level, MAX_LEVEL)):
+            raise AssertionError("The head links a level above the levels in use")
+        return self.level
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Usage: python Skip_List.py [benchmark options], e.g. python Skip_List.py --sizes 10000 100000 --distributions sorted zipfian
+if __name__ == "__main__":
+    from benchmark import main
+    main(sys.argv[1:], default_engines=("skiplist",))
@@ -0,0 +1,242 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Project demonstrating a treap - a binary search tree balanced by random priorities
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+import sys, random
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Node class
+class Node:
+    __slots__ = ("value", "priority", "left", "right")
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+
+# Treap class - same interface as the BinarySearchTree classes
+# Ordered by value like a BST and by priority like a heap (a parent's priority is never lower than its
+# children's). With random priorities the shape is that of a BST built in random order, so the expected
+# height is O(log n) whatever order the values arrive in, with no balance information to maintain
+class Treap:
+    # Constructor - seed makes the priorities, and so the tree's shape, repeatable
+    def __init__(self, seed=None):
+        self.root = None
+        self.size = 0
+        self.random = random.Random(seed)
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder(self.root)
+
+    # Method to insert a value into the tree
+    def insert(self, value):
+        self.root = self._insert_rec(self.root, value)
+
+    # Recursive method to insert a value as a leaf, then rotate it up while its priority is higher than its parent's
+    def _insert_rec(self, node, value):
+        if node is None:
+            self.size += 1
+            return Node(value, self.random.random())
+
+        # Less goes left, greater goes right
+        if value < node.value:
+            node.left = self._insert_rec(node.left, value)
+            if node.left.priority > node.priority:
+                node = self._right_rotate(node)
+        elif value > node.value:
+            node.right = self._insert_rec(node.right, value)
+            if node.right.priority > node.priority:
+                node = self._left_rotate(node)
+        # Duplicate values not allowed
+        return node
+
+    # Method to delete a value from the tree
+    def delete(self, value):
+        parent = None
+        node = self.root
+        while node is not None and node.value != value:
+            parent = node
+            node = node.left if value < node.value else node.right
+        # Value not in the tree
+        if node is None:
+            return
+
+        # Replace the node by its two subtrees joined together
+        joined = self._join(node.left, node.right)
+        if parent is None:
+            self.root = joined
+        elif parent.left is node:
+            parent.left = joined
+        else:
+            parent.right = joined
+        self.size -= 1
+
+    # Method to join two treaps where every value in left is smaller than every value in right
+    # The root with the higher priority stays on top, walking down the right spine of left and the left spine of right
+    def _join(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            top = left
+            left = left.right
+            top.right = self._join(left, right)
+        else:
+            top = right
+            right = right.left
+            top.left = self._join(left, right)
+        return top
+
+    # Helper method for right rotation
+    def _right_rotate(self, y):
+        x = y.left
+        y.left = x.right
+        x.right = y
+        return x
+
+    # Helper method for left rotation
+    def _left_rotate(self, x):
+        y = x.right
+        x.right = y.left
+        y.left = x
+        return y
+
+    # Method to find the maximum value in the tree - the rightmost node
+    def maximum(self):
+        if self.root is None:
+            return None
+        node = self.root
+        while node.right is not None:
+            node = node.right
+        return node.value
+
+    # Method to traverse the tree in a specific order - default to inorder traversal
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
+    def traverse(self, order="inorder"):
+        result = [None] * self.size
+        i = 0
+        for value in self.iter_traverse(order):
+            result[i] = value
+            i += 1
+        return result
+
+    # Method to return a lazy iterator over the tree in a specific order
+    def iter_traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._inorder(self.root)
+        elif order == "preorder":
+            return self._preorder(self.root)
+        elif order == "postorder":
+            return self._postorder(self.root)
+        else:
+            raise ValueError("Invalid traversal order. Choose 'inorder', 'preorder', or 'postorder'.")
+
+    # Generator for inorder traversal, using an explicit stack instead of recursion
+    def _inorder(self, node):
+        stack = []
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    # Generator for preorder traversal
+    def _preorder(self, node):
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            yield node.value
+            # Push right first so the left subtree comes out first
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+    # Generator for postorder traversal
+    def _postorder(self, node):
+        stack = []
+        last_visited = None
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            # Visit the right subtree first unless it is empty or was just finished
+            if top.right and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                yield top.value
+                last_visited = top
+
+    # Method to build a treap from values in increasing order in O(n)
+    # Each new value goes on the right spine: nodes with lower priorities are popped off and become its left subtree
+    # Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable, seed=None):
+        tree = cls(seed)
+        spine = []
+        last = None
+        for value in iterable:
+            if tree.size and value <= last:
+                if value == last:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {last}")
+            node = Node(value, tree.random.random())
+            below = None
+            while spine and spine[-1].priority < node.priority:
+                below = spine.pop()
+            node.left = below
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+            last = value
+            tree.size += 1
+        tree.root = spine[0] if spine else None
+        return tree
+
+    # Method to remove every value at once
+    def clear(self):
+        self.root = None
+        self.size = 0
+
+    # Method to check the treap rules: keys in order, no child with a higher priority than its parent, size correct
+    # Raises AssertionError at the first broken node and returns the tree height otherwise
+    def check_invariants(self):
+        count = 0
+        height = 0
+        # (node, lower bound, upper bound, depth)
+        stack = [(self.root, None, None, 1)] if self.root else []
+        while stack:
+            node, low, high, depth = stack.pop()
+            count += 1
+            height = max(height, depth)
+            if (low is not None and node.value <= low) or (high is not None and node.value >= high):
+                raise AssertionError(f"{node.value} is out of order (must be between {low} and {high})")
+            for child, child_low, child_high in ((node.left, low, node.value), (node.right, node.value, high)):
+                if child is not None:
+                    if child.priority > node.priority:
+                        raise AssertionError(f"Node {child.value} has a higher priority than its parent {node.value}")
+                    stack.append((child, child_low, child_high, depth + 1))
+        if count != self.size:
+            raise AssertionError(f"Tree holds {count} values but its size is {self.size}")
+        return height
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Usage: python Treap.py [benchmark options], e.g. python Treap.py --sizes 10000 100000 --distributions sorted zipfian
+if __name__ == "__main__":
+    from benchmark import main
+    main(sys.argv[1:], default_engines=("treap",))
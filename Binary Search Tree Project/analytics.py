@@ -4,52 +4,53 @@
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Libraries
-import csv
+import argparse, csv
 import matplotlib.pyplot as plt
 import numpy as np
-
-# Function to read the CSV file and organize the results
-def read_performance_data(file_path):
-    # Dictionary to hold the data, structured by test size and operation
-    performance_data = {
-        '100': {'insert': [], 'delete': [], 'traverse': [], 'maximum': []},
-        '1000': {'insert': [], 'delete': [], 'traverse': [], 'maximum': []},
-        '10000': {'insert': [], 'delete': [], 'traverse': [], 'maximum': []},
-        '100000': {'insert': [], 'delete': [], 'traverse': [], 'maximum': []}
-    }
-
-    # Read the CSV file
-    with open(file_path, 'r') as file:
-        csv_reader = csv.reader(file)
-        # Skip the header line
-        next(csv_reader)  
-
-        for row in csv_reader:
-            size, operation, perf_time = row[0], row[1], float(row[2])
+from engines import ENGINE_LABELS
+from benchmark import DISTRIBUTIONS, RESULTS_FILE
+
+# Columns a chart can show, with their axis labels
+METRICS = {
+    "median_s": "Median Time per Trial (seconds)",
+    "per_op_ns": "Median Time per Operation (ns)",
+    "p99_ns": "99th Percentile Single-Operation Latency (ns)",
+}
+
+# Function to read the labeled rows written by benchmark.py and organize the results
+# Returns {engine: {size: {operation: value}}} for one input distribution, averaging rows repeated across runs
+# Rows with no value for the metric (e.g. no percentiles for the bulk operations) are left out
+def read_performance_data(file_path, distribution="shuffled", metric="median_s"):
+    performance_data = {}
+
+    with open(file_path, 'r', newline='') as file:
+        for row in csv.DictReader(file):
+            if row["distribution"] != distribution or row[metric] == "":
+                continue
 
             # Normalize the operation name to lowercase and strip any extra spaces
-            operation = operation.strip().lower()
+            operation = row["operation"].strip().lower()
 
             # Handle variations in operation names (e.g., 'max' and 'maximum')
             if operation == 'max':
                 operation = 'maximum'
 
-            # Ensure the size and operation are valid
-            if size in performance_data and operation in performance_data[size]:
-                performance_data[size][operation].append(perf_time)
+            (performance_data.setdefault(row["engine"], {}).setdefault(row["size"], {})
+             .setdefault(operation, []).append(float(row[metric])))
 
     # Calculate average performance for each operation at each test size
     averages = {}
-    for size, operations in performance_data.items():
-        averages[size] = {op: np.mean(times) for op, times in operations.items()}
+    for engine, sizes in performance_data.items():
+        averages[engine] = {size: {op: np.mean(values) for op, values in operations.items()}
+                            for size, operations in sizes.items()}
 
     return averages
 
 # Function to plot the bar graph
-def plot_performance_data(averages):
+def plot_performance_data(averages, ylabel=METRICS["median_s"]):
     # Test sizes and operations
-    test_sizes = ['100', '1000', '10000', '100000']
-    operations = ['insert', 'delete', 'traverse', 'maximum']
+    test_sizes = sorted(averages, key=int)
+    operations = [op for op in ['insert', 'delete', 'traverse', 'maximum'] if all(op in averages[size] for size in test_sizes)]
 
     # Prepare data for plotting
     data = {operation: [averages[size][operation] for size in test_sizes] for operation in operations}
@@ -70,7 +71,7 @@ def plot_performance_data(averages):
 
     # Set labels and title
     ax.set_xlabel('Test Size')
-    ax.set_ylabel('Average Time (seconds)')
+    ax.set_ylabel(ylabel)
     ax.set_title('Performance Data for Different Operations')
     ax.set_xticks(x + width * 1.5)
     ax.set_xticklabels(test_sizes)
@@ -86,8 +87,46 @@ def plot_performance_data(averages):
     plt.tight_layout()
     plt.show()
 
-# Example usage
-# file_path = 'BSTperformance_results.csv'
-file_path = 'AVLperformance_results.csv' 
-averages = read_performance_data(file_path)
-plot_performance_data(averages)
+# Function to plot the engines side by side: one panel per operation, one group of bars per test size
+# Times are on a log scale so the slow engines don't flatten the fast ones
+def plot_engine_comparison(engine_averages, operations=('insert', 'delete', 'traverse', 'maximum'), ylabel=METRICS["median_s"]):
+    test_sizes = sorted({size for averages in engine_averages.values() for size in averages}, key=int)
+    fig, axes = plt.subplots(1, len(operations), figsize=(5 * len(operations), 5))
+    width = 0.8 / len(engine_averages)
+    x = np.arange(len(test_sizes))
+
+    for ax, operation in zip(np.atleast_1d(axes), operations):
+        for i, (engine, averages) in enumerate(engine_averages.items()):
+            times = [averages.get(size, {}).get(operation, np.nan) for size in test_sizes]
+            ax.bar(x + i * width, times, width, label=ENGINE_LABELS[engine])
+        ax.set_title(operation.capitalize())
+        ax.set_xlabel('Test Size')
+        ax.set_xticks(x + width * (len(engine_averages) - 1) / 2)
+        ax.set_xticklabels(test_sizes)
+        ax.set_yscale('log')
+    np.atleast_1d(axes)[0].set_ylabel(ylabel)
+    np.atleast_1d(axes)[0].legend()
+
+    plt.tight_layout()
+    plt.show()
+
+# Usage: python analytics.py [--engines ...] [--distribution ...] [--metric ...] [--input file]
+# One engine gets the detailed chart, several are compared; by default every engine in the results file is compared
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chart the tree benchmark results.")
+    parser.add_argument("--input", default=RESULTS_FILE)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINE_LABELS))
+    parser.add_argument("--distribution", default="shuffled", choices=DISTRIBUTIONS)
+    parser.add_argument("--metric", default="median_s", choices=list(METRICS))
+    options = parser.parse_args()
+
+    engine_averages = read_performance_data(options.input, options.distribution, options.metric)
+    engines = [engine for engine in options.engines or ENGINE_LABELS if engine in engine_averages]
+    if not engines:
+        raise SystemExit(f"No {options.distribution} results for those engines in {options.input}")
+    if len(engines) == 1:
+        plot_performance_data(engine_averages[engines[0]], METRICS[options.metric])
+    else:
+        operations = [op for op in ('insert', 'delete', 'traverse', 'maximum')
+                      if any(op in averages for engine in engines for averages in engine_averages[engine].values())]
+        plot_engine_comparison({engine: engine_averages[engine] for engine in engines}, operations, METRICS[options.metric])
@@ -0,0 +1,297 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Benchmark harness shared by the tree engines
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Example runs:
+#   python benchmark.py                                       # BST and AVL, shuffled input, 100 to 100000 keys
+#   python benchmark.py --engines avl redblack treap skiplist bplus --sizes 10000 100000 1000000
+#   python benchmark.py --engines avl bplus --distributions shuffled sorted reversed zipfian --trials 5
+# The plain BST degenerates into a linked list on sorted or reversed input, so every insert walks the
+# whole tree - keep its sizes small for those distributions
+
+# Libraries
+import argparse, csv, gc, math, os, random, sys, tempfile, time
+from time import perf_counter_ns
+from engines import ENGINES, get_engine
+from main import read_csv
+
+DISTRIBUTIONS = ["shuffled", "sorted", "reversed", "zipfian"]
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+# Skew of the zipfian order: the larger, the closer to sorted
+ZIPF_EXPONENT = 1.0
+# Number of random values each order-statistic query is timed over
+QUERY_SAMPLE = 1000
+RESULTS_FILE = "tree_performance_results.csv"
+
+# Columns of every row written by the harness
+# The *_ns latency columns are single-operation times, filled for the operations timed one call at a time
+RESULT_FIELDS = ["engine", "distribution", "size", "operation", "trials", "min_s", "median_s", "max_s",
+                 "per_op_ns", "p50_ns", "p90_ns", "p99_ns", "max_ns", "height"]
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to get the integers 1..size, from the test CSV when there is one for that size
+def load_integers(size):
+    test_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"test{size}.csv")
+    if os.path.exists(test_file):
+        return read_csv(test_file)
+    return list(range(1, size + 1))
+
+# Function to put the integers 1..size in the insertion order of a distribution, repeatably for a given seed
+#   shuffled - uniformly random order
+#   sorted / reversed - ascending / descending, the worst case for an unbalanced tree
+#   zipfian - each next value is picked from those left with probability proportional to 1 / rank ** ZIPF_EXPONENT,
+#             so small values tend to come first: mostly ascending with a lot of local disorder
+def generate_values(size, distribution="shuffled", seed=0):
+    values = sorted(load_integers(size))
+    rng = random.Random(seed)
+    if distribution == "shuffled":
+        rng.shuffle(values)
+    elif distribution == "reversed":
+        values.reverse()
+    elif distribution == "zipfian":
+        # Weighted sampling without replacement: sort by an exponential draw scaled by 1 / weight
+        weights = {value: rng.expovariate(1.0) * (rank + 1) ** ZIPF_EXPONENT for rank, value in enumerate(values)}
+        values.sort(key=weights.__getitem__)
+    elif distribution != "sorted":
+        raise ValueError(f"Unknown distribution '{distribution}'. Choose from: {', '.join(DISTRIBUTIONS)}.")
+    return values
+
+# Function to interpolate a percentile (fraction between 0 and 1) from sorted values
+def percentile(sorted_values, fraction):
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+# Function to time one call of func, with the garbage collector paused unless keep_gc is set
+def timed_call(func, keep_gc=False):
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if not keep_gc:
+        gc.disable()
+    try:
+        start_time = time.perf_counter()
+        result = func()
+        end_time = time.perf_counter()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return result, end_time - start_time
+
+# Function to call func once per value, timing every call, and return the latencies in nanoseconds
+# The trial time is their sum, so it leaves out the loop itself but includes the clock reads
+def timed_each(func, values, keep_gc=False):
+    latencies = [0] * len(values)
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if not keep_gc:
+        gc.disable()
+    try:
+        for i, value in enumerate(values):
+            start_time = perf_counter_ns()
+            func(value)
+            latencies[i] = perf_counter_ns() - start_time
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return latencies
+
+# Function to run an iterator to the end without storing its values
+def consume(iterator):
+    for _ in iterator:
+        pass
+
+# Function to summarize the trial times of one operation as a labeled row
+# count is the number of operations in one trial; latencies (in ns, from every trial) fill the percentile columns
+def summarize(engine, distribution, size, operation, times, count, latencies=None, height=""):
+    times = sorted(times)
+    median = percentile(times, 0.5)
+    latencies = sorted(latencies) if latencies else None
+    return {
+        "engine": engine,
+        "distribution": distribution,
+        "size": size,
+        "operation": operation,
+        "trials": len(times),
+        "min_s": f"{times[0]:.9f}",
+        "median_s": f"{median:.9f}",
+        "max_s": f"{times[-1]:.9f}",
+        "per_op_ns": f"{median / max(count, 1) * 1e9:.1f}",
+        "p50_ns": f"{percentile(latencies, 0.5):.0f}" if latencies else "",
+        "p90_ns": f"{percentile(latencies, 0.9):.0f}" if latencies else "",
+        "p99_ns": f"{percentile(latencies, 0.99):.0f}" if latencies else "",
+        "max_ns": latencies[-1] if latencies else "",
+        "height": height,
+    }
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to benchmark one engine on one list of values (already in insertion order)
+# Every trial inserts the values one by one into a fresh tree, runs the read operations, deletes the
+# values one by one in the same order, then times a bulk build, a save and reload where supported, and a bulk clear
+# Engines with rank() also get the order-statistic queries timed
+def benchmark_engine(engine, values, distribution, trials=3, keep_gc=False, seed=0):
+    tree_class = get_engine(engine)
+    size = len(values)
+    sorted_values = sorted(values)
+    rng = random.Random(seed)
+    sample = [rng.choice(values) for _ in range(QUERY_SAMPLE)] if values else []
+    times, latencies, counts = {}, {}, {}
+    height = ""
+
+    # Record one operation's trial time, the number of operations it covered, and any single-op latencies
+    def record(operation, elapsed, count, operation_latencies=None):
+        times.setdefault(operation, []).append(elapsed)
+        counts[operation] = count
+        if operation_latencies is not None:
+            latencies.setdefault(operation, []).extend(operation_latencies)
+
+    for _ in range(trials):
+        tree = tree_class()
+        insert_latencies = timed_each(tree.insert, values, keep_gc)
+        record("Insert", sum(insert_latencies) / 1e9, size, insert_latencies)
+        if hasattr(tree, "check_invariants"):
+            height = tree.check_invariants()
+
+        _, elapsed = timed_call(tree.maximum, keep_gc)
+        record("Max", elapsed, 1)
+        if hasattr(tree, "minimum"):
+            _, elapsed = timed_call(tree.minimum, keep_gc)
+            record("Min", elapsed, 1)
+        _, elapsed = timed_call(tree.traverse, keep_gc)
+        record("Traverse", elapsed, size)
+        _, elapsed = timed_call(lambda: consume(iter(tree)), keep_gc)
+        record("Iterate", elapsed, size)
+
+        if hasattr(tree, "rank") and size:
+            positions = [rng.randrange(size) for _ in range(QUERY_SAMPLE)]
+            width = max(1, size // 10)
+            for operation, func, arguments in (("Rank", tree.rank, sample),
+                                               ("Select", tree.select, positions),
+                                               ("Count Range", lambda x: tree.count_range(x, x + width), sample),
+                                               ("Floor", tree.floor, sample),
+                                               ("Ceiling", tree.ceiling, sample)):
+                query_latencies = timed_each(func, arguments, keep_gc)
+                record(operation, sum(query_latencies) / 1e9, len(arguments), query_latencies)
+
+        delete_latencies = timed_each(tree.delete, values, keep_gc)
+        record("Delete", sum(delete_latencies) / 1e9, size, delete_latencies)
+
+        tree, elapsed = timed_call(lambda: tree_class.from_sorted(sorted_values), keep_gc)
+        record("Build", elapsed, size)
+        # Saving to a key file and loading it back, for the engines that support it (see key_file.py)
+        if hasattr(tree_class, "load"):
+            path = os.path.join(tempfile.gettempdir(), f"benchmark_{engine}_{os.getpid()}.keys")
+            try:
+                _, elapsed = timed_call(lambda: tree.dump(path), keep_gc)
+                record("Dump", elapsed, size)
+                _, elapsed = timed_call(lambda: tree_class.load(path), keep_gc)
+                record("Load", elapsed, size)
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+        _, elapsed = timed_call(tree.clear, keep_gc)
+        record("Clear", elapsed, size)
+
+    return [summarize(engine, distribution, size, operation, operation_times, counts[operation],
+                      latencies.get(operation), height)
+            for operation, operation_times in times.items()]
+
+# Function to run a mixed workload: after the initial load, each round deletes a random half of the
+# values and inserts as many new ones above the current maximum, checking the tree height as it goes
+# Returns a row for the total time of the rounds, with the final height
+def benchmark_mixed(engine, values, distribution, rounds=10, keep_gc=False, seed=0):
+    tree = get_engine(engine)()
+    for x in values:
+        tree.insert(x)
+    rng = random.Random(seed)
+    present = list(values)
+    next_value = max(present) + 1 if present else 0
+    heights = [tree.check_invariants()]
+
+    elapsed_total = 0.0
+    for _ in range(rounds):
+        rng.shuffle(present)
+        half = len(present) // 2
+        removed, present = present[:half], present[half:]
+        added = list(range(next_value, next_value + half))
+        next_value += half
+
+        _, elapsed = timed_call(lambda: ([tree.delete(x) for x in removed], [tree.insert(x) for x in added]), keep_gc)
+        elapsed_total += elapsed
+        present.extend(added)
+        heights.append(tree.check_invariants())
+
+    # An AVL tree of n nodes is never taller than about 1.44 * log2(n + 2), a red-black tree 2 * log2(n + 1)
+    print(f"{engine:>10} {distribution:>9} {len(values):>8} keys: height after each round {heights} "
+          f"(log2(n) = {math.log2(max(len(values), 1)):.1f})")
+    return summarize(engine, distribution, len(values), "Mixed", [elapsed_total], rounds * len(values), height=heights[-1])
+
+# Function to print one result row to the console
+def print_row(row):
+    latency = (f", single op p50 {row['p50_ns']} ns p99 {row['p99_ns']} ns max {row['max_ns']} ns"
+               if row['p50_ns'] != "" else "")
+    height = f", height {row['height']}" if row['height'] != "" else ""
+    print(f"{row['engine']:>10} {row['distribution']:>9} {row['size']:>8} keys {row['operation']:>12}: "
+          f"median {float(row['median_s']):.6f}s ({row['per_op_ns']} ns/op{latency}{height})")
+
+# Function to run every engine over every size and distribution, printing each row as it finishes
+def run_benchmark(engines, sizes=None, distributions=("shuffled",), trials=3, keep_gc=False, seed=0, mixed=True):
+    rows = []
+    for size in sizes or DEFAULT_SIZES:
+        for distribution in distributions:
+            values = generate_values(size, distribution, seed)
+            for engine in engines:
+                engine_rows = benchmark_engine(engine, values, distribution, trials, keep_gc, seed)
+                if mixed and hasattr(get_engine(engine), "check_invariants"):
+                    engine_rows.append(benchmark_mixed(engine, values, distribution, keep_gc=keep_gc, seed=seed))
+                for row in engine_rows:
+                    print_row(row)
+                rows.extend(engine_rows)
+    return rows
+
+# Function to append rows to the results CSV, writing the header if the file is new
+def save_results(file_name, rows, fields=RESULT_FIELDS):
+    file_exists = os.path.exists(file_name) and os.path.getsize(file_name) > 0
+    with open(file_name, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(rows)
+    print(f"Performance data saved to {file_name}")
+
+# Function to run the benchmark for one engine and save the results - what each engine module runs as a script
+def run_tests(engine, sizes=None, distributions=("shuffled",), trials=3, output=RESULTS_FILE):
+    rows = run_benchmark([engine], sizes, distributions, trials)
+    save_results(output, rows)
+    return rows
+
+# Command line options shared by the harness and the engine modules
+def parse_arguments(arguments=None, default_engines=("bst", "avl")):
+    parser = argparse.ArgumentParser(description="Benchmark the tree engines.")
+    parser.add_argument("--engines", nargs="+", default=list(default_engines), choices=list(ENGINES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="numbers of keys (test CSVs are used where they exist, otherwise 1..n)")
+    parser.add_argument("--distributions", nargs="+", default=["shuffled"], choices=DISTRIBUTIONS,
+                        help="insertion orders to try")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-gc", action="store_true", help="leave the garbage collector on while timing")
+    parser.add_argument("--no-mixed", action="store_true", help="skip the insert/delete rounds that track height")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    return parser.parse_args(arguments)
+
+def main(arguments=None, default_engines=("bst", "avl")):
+    options = parse_arguments(arguments, default_engines)
+    rows = run_benchmark(options.engines, options.sizes, options.distributions, options.trials,
+                         options.keep_gc, options.seed, not options.no_mixed)
+    save_results(options.output, rows)
+    return rows
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Main execution
+if __name__ == "__main__":
+    main(sys.argv[1:])
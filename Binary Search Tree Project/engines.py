@@ -0,0 +1,45 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Registry of the ordered-set engines, so the test drivers and analytics can pick one by name
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Libraries
+from main import BinarySearchTree
+from Self_Balancing import BinarySearchTree as AVLTree
+from Compact_AVL import CompactAVLTree
+from Persistent_AVL import PersistentAVLTree
+from Red_Black import RedBlackTree
+from Treap import Treap
+from Skip_List import SkipList
+from B_Plus_Tree import BPlusTree
+
+# Every engine has insert, delete, maximum, traverse, iter_traverse, len(), from_sorted and clear
+ENGINES = {
+    "bst": BinarySearchTree,
+    "avl": AVLTree,
+    "compact": CompactAVLTree,
+    "persistent": PersistentAVLTree,
+    "redblack": RedBlackTree,
+    "treap": Treap,
+    "skiplist": SkipList,
+    "bplus": BPlusTree,
+}
+
+# Name of each engine in printed results and chart labels
+ENGINE_LABELS = {
+    "bst": "BST",
+    "avl": "AVL",
+    "compact": "CompactAVL",
+    "persistent": "PersistentAVL",
+    "redblack": "RedBlack",
+    "treap": "Treap",
+    "skiplist": "SkipList",
+    "bplus": "BPlus",
+}
+
+# Function to look up an engine class by name
+def get_engine(name):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}'. Choose from: {', '.join(ENGINES)}.")
+    return ENGINES[name]
+
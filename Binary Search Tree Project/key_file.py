@@ -0,0 +1,179 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Binary file of sorted integer keys, for saving and reloading the trees without re-inserting
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# A key file is a header followed by the keys in increasing order as packed little-endian 64-bit integers
+# Reading one back is a single read and a copy into an array, and because the keys are sorted the tree
+# can be rebuilt balanced in O(n), or the file can be memory-mapped and searched in place
+
+import mmap, os, struct, sys, tempfile, time
+from array import array
+from bisect import bisect_left, bisect_right
+
+KEY_MAGIC = b"BSTKEY01"
+# Header: magic, number of keys (8 bytes of padding keep the keys 16-byte aligned)
+KEY_HEADER = struct.Struct("<8sQ8x")
+
+
+# Function to write keys (increasing integers that fit in 64 bits) to a key file
+# The file is written under a temporary name and renamed into place, so a crash never leaves half a file
+def write_keys(path, keys):
+    packed = array('q', keys)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(KEY_HEADER.pack(KEY_MAGIC, len(packed)))
+        file.write(packed.tobytes())
+    os.replace(temporary_path, path)
+    return len(packed)
+
+# Function to read the header of a key file from a buffer, checking it against the buffer's length
+def _read_header(path, data):
+    if len(data) < KEY_HEADER.size:
+        raise ValueError(f"'{path}' is not a key file")
+    magic, count = KEY_HEADER.unpack_from(data, 0)
+    if magic != KEY_MAGIC:
+        raise ValueError(f"'{path}' is not a key file")
+    if len(data) != KEY_HEADER.size + count * 8:
+        raise ValueError(f"'{path}' should hold {count} keys but is {len(data)} bytes long")
+    return count
+
+# Function to read every key of a key file into an array
+def read_keys(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    _read_header(path, data)
+    keys = array('q')
+    keys.frombytes(memoryview(data)[KEY_HEADER.size:])
+    if sys.byteorder == "big":
+        keys.byteswap()
+    return keys
+
+
+# Sorted keys served straight from a memory-mapped key file - nothing is read until it is needed
+# Lookups are binary searches over the mapped array, so opening costs the same whatever the file's size
+# Read-only, with the query side of the tree API; close() it (or use it in a with block) when done
+class MappedSortedKeys:
+    # Constructor - maps the whole file read-only
+    def __init__(self, path):
+        # The keys are viewed in place as native integers, which only matches the file on little-endian machines
+        if sys.byteorder == "big":
+            raise ValueError("Memory-mapped key files need a little-endian machine; use read_keys instead")
+        self.path = path
+        self.file = open(path, 'rb')
+        # Don't leave the file or the map open if this isn't a key file (or can't be mapped, e.g. it's empty)
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self.size = _read_header(path, self.map)
+                self.keys = memoryview(self.map)[KEY_HEADER.size:].cast('q')
+            except BaseException:
+                self.map.close()
+                raise
+        except BaseException:
+            self.file.close()
+            raise
+
+    # Method to report the number of keys
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the keys in sorted order
+    def __iter__(self):
+        return iter(self.keys)
+
+    # Method to check whether a key is in the file, with a binary search
+    def __contains__(self, value):
+        i = bisect_left(self.keys, value)
+        return i < self.size and self.keys[i] == value
+
+    # Method to check whether a key is in the file - same as the in operator
+    def search(self, value):
+        return value in self
+
+    # Method to find the maximum key - None if there are none
+    def maximum(self):
+        return self.keys[-1] if self.size else None
+
+    # Method to find the minimum key - None if there are none
+    def minimum(self):
+        return self.keys[0] if self.size else None
+
+    # Method to count the keys smaller than x
+    def rank(self, x):
+        return bisect_left(self.keys, x)
+
+    # Method to return the k-th smallest key, counting from 0
+    def select(self, k):
+        if k < 0 or k >= self.size:
+            raise IndexError(f"select({k}) is out of range for {self.size} keys")
+        return self.keys[k]
+
+    # Method to count the keys between lo and hi, both included
+    def count_range(self, lo, hi):
+        if hi < lo:
+            return 0
+        return bisect_right(self.keys, hi) - bisect_left(self.keys, lo)
+
+    # Generator over the keys between lo and hi (both included) in sorted order
+    def iter_range(self, lo, hi):
+        start, end = bisect_left(self.keys, lo), bisect_right(self.keys, hi)
+        for i in range(start, end):
+            yield self.keys[i]
+
+    # Method to copy every key into a list in sorted order
+    def traverse(self, order="inorder"):
+        if order != "inorder":
+            raise ValueError("A sorted array has no tree shape, so 'inorder' is the only traversal order.")
+        return self.keys.tolist()
+
+    # Method to unmap the file - the view has to go before the map it points into
+    def close(self):
+        if self.map is not None:
+            self.keys.release()
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Function to compare the ways to get a tree of size keys ready for lookups: reading the test CSV and
+# inserting key by key (shuffled, since the CSVs are sorted), loading a key file into a balanced tree,
+# and memory-mapping the key file - the key file goes in the temporary directory and is always removed
+def compare_startup(size, seed=0):
+    from benchmark import generate_values, timed_call
+    from main import BinarySearchTree
+    from Self_Balancing import BinarySearchTree as AVLTree
+
+    values = generate_values(size, "shuffled", seed)
+    path = os.path.join(tempfile.gettempdir(), f"compare_startup_{os.getpid()}.keys")
+    try:
+        AVLTree.from_sorted(sorted(values)).dump(path)
+        print(f"{size} keys ({os.path.getsize(path)} byte key file):")
+        for name, tree_class in (("BST", BinarySearchTree), ("AVL", AVLTree)):
+            tree = tree_class()
+            _, perf_time_insert = timed_call(lambda: [tree.insert(x) for x in generate_values(size, "shuffled", seed)])
+            _, perf_time_load = timed_call(lambda: tree_class.load(path))
+            print(f"  {name}: CSV and inserts {perf_time_insert:.4f} s, load from key file {perf_time_load:.4f} s")
+        start_time = time.perf_counter()
+        with MappedSortedKeys(path) as keys:
+            found = sum(1 for x in values[:1000] if x in keys)
+            perf_time_mapped = time.perf_counter() - start_time
+        print(f"  Memory-mapped: open and {found} lookups {perf_time_mapped:.4f} s")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+# Usage: python key_file.py [sizes...]
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for size in sizes:
+        compare_startup(size)
@@ -4,7 +4,9 @@
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Libraries
-import csv, time, random
+import csv, time, random, sys
+from key_file import write_keys, read_keys
+from sorted_tree import SortedTreeMixin
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # Node class
@@ -20,69 +22,97 @@ class Node:
         return f"Node({self.value})"
 
 # Binary Search Tree class
-class BinarySearchTree:
+class BinarySearchTree(SortedTreeMixin):
+    node_class = Node
+
     # Constructor
     def __init__(self):
         self.root = None
+        # Number of values in the tree, so traverse() can allocate its result list once
+        self.size = 0
+
+    # Method to report the number of values in the tree
+    def __len__(self):
+        return self.size
+
+    # Method to iterate over the values in sorted order without building a list
+    def __iter__(self):
+        return self._inorder(self.root)
 
     # Method to insert a value into the tree
+    # Walks down with a loop instead of recursion, so a skewed tree (e.g. sorted input) can't hit the recursion limit
     def insert(self, value):
         if self.root is None:
             self.root = Node(value)
-        else:
-            # Call the recursive insert method to find the correct position
-            self._insert_rec(self.root, value)
-
-    # Recursive method to insert a value into the tree
-    def _insert_rec(self, current, value):
-        # If the value is less than the current node's value, go left
-        if value < current.value:
-            if current.left is None:
-                current.left = Node(value)
-            else:
-                self._insert_rec(current.left, value)
+            self.size += 1
+            return
+
+        current = self.root
+        while True:
+            # If the value is less than the current node's value, go left
+            if value < current.value:
+                if current.left is None:
+                    current.left = Node(value)
+                    self.size += 1
+                    return
+                current = current.left
+
+            # If the value is greater than the current node's value, go right
+            elif value > current.value:
+                if current.right is None:
+                    current.right = Node(value)
+                    self.size += 1
+                    return
+                current = current.right
 
-        # If the value is greater than the current node's value, go right
-        elif value > current.value:
-            if current.right is None:
-                current.right = Node(value)
             else:
-                self._insert_rec(current.right, value)
-
-        else:
-            print("Value already exists in the tree.")
+                return  # Duplicate values not allowed
+
+    # Method to find the node holding a value - returns None if the value is not in the tree
+    def search(self, value):
+        current = self.root
+        while current is not None:
+            if value < current.value:
+                current = current.left
+            elif value > current.value:
+                current = current.right
+            else:
+                return current
+        return None
 
     # Method to delete a nodee from the tree while keeping the tree balanced
     def delete(self, value):
-        self.root = self._delete_rec(self.root, value)
-
-    # Recursive method to delete a node from the tree
-    def _delete_rec(self, current, value):
-        # If the tree is empty - Base Case
+        # Find the node and its parent
+        parent = None
+        current = self.root
+        while current is not None and current.value != value:
+            parent = current
+            # Lesser values go left, greater values go right
+            current = current.left if value < current.value else current.right
+
+        # Value not in the tree
         if current is None:
-            return current
-
-        # Lesser values go left
-        if value < current.value:
-            current.left = self._delete_rec(current.left, value)
-        # Greater values go right
-        elif value > current.value:
-            current.right = self._delete_rec(current.right, value)
+            return
+
+        # Case 2: Two children - take the inorder successor's value, then remove the successor instead
+        if current.left is not None and current.right is not None:
+            successor_parent = current
+            successor = current.right
+            while successor.left is not None:
+                successor_parent = successor
+                successor = successor.left
+            current.value = successor.value
+            parent, current = successor_parent, successor
+
+        # Case 1: No child or one child - replace the node with its only child (or None)
+        child = current.left if current.left is not None else current.right
+        if parent is None:
+            self.root = child
+        elif parent.left is current:
+            parent.left = child
         else:
-            # Case 1: No child or one child
-            if current.left is None:
-                # Replace the node with its right child
-                return current.right
-            elif current.right is None:
-                # Replace the node with its left child
-                return current.left
-
-            # Case 2: Two children
-            current.value = self._find_min(current.right).value
-            # Delete the inorder successor
-            current.right = self._delete_rec(current.right, current.value)
-
-        return current
+            parent.right = child
+        self.size -= 1
 
     # Method to find the minimum value node in the tree
     def _find_min(self, node):
@@ -98,7 +128,7 @@ class BinarySearchTree:
         else:
             return self._maximum_rec(self.root)
 
-    # Recursive method to find the maximum value node in the tree
+    # Method to find the maximum value node in the tree
     def _maximum_rec(self, node):
         current = node
         while current.right is not None:
@@ -106,7 +136,14 @@ class BinarySearchTree:
         return current.value
 
     # Method to traverse the tree in a specific order - default to inorder traversal
+    # Returns a list filled in one pass; use iter_traverse() to stream the values instead
     def traverse(self, order="inorder"):
+        if order == "inorder":
+            return self._fill_inorder(self.root)
+        return self._fill(self.iter_traverse(order))
+
+    # Method to return a lazy iterator over the tree in a specific order
+    def iter_traverse(self, order="inorder"):
         if order == "inorder":
             return self._inorder(self.root)
         elif order == "preorder":
@@ -116,32 +153,86 @@ class BinarySearchTree:
         else:
             raise ValueError("Invalid traversal order. Choose 'inorder', 'preorder', or 'postorder'.")
 
-    # Recursive method for inorder traversal
-    def _inorder(self, node):
-        result = []
-        if node:
-            result += self._inorder(node.left)
-            result.append(node.value)
-            result += self._inorder(node.right)
+    # Method to copy values into one list allocated up front at the tree's size
+    def _fill(self, values):
+        result = [None] * self.size
+        i = 0
+        for value in values:
+            result[i] = value
+            i += 1
         return result
 
-    # Recursive method for preorder traversal
+    # Inorder traversal written straight into a preallocated list, without the generator in between
+    def _fill_inorder(self, node):
+        result = [None] * self.size
+        i = 0
+        stack = []
+        while True:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return result
+            node = stack.pop()
+            result[i] = node.value
+            i += 1
+            node = node.right
+
+    # Generator for inorder traversal, using an explicit stack instead of recursion
+    def _inorder(self, node):
+        stack = []
+        while stack or node:
+            # Go as far left as possible, remembering the path
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    # Generator for preorder traversal
     def _preorder(self, node):
-        result = []
-        if node:
-            result.append(node.value)
-            result += self._preorder(node.left)
-            result += self._preorder(node.right)
-        return result
-
-    # Recursive method for postorder traversal
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            yield node.value
+            # Push right first so the left subtree comes out first
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+    # Generator for postorder traversal
     def _postorder(self, node):
-        result = []
-        if node:
-            result += self._postorder(node.left)
-            result += self._postorder(node.right)
-            result.append(node.value)
-        return result
+        stack = []
+        last_visited = None
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            # Visit the right subtree first unless it is empty or was just finished
+            if top.right and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                yield top.value
+                last_visited = top
+
+    # Method to save the values to a key file: a small header, then the sorted values packed as 64-bit integers
+    def dump(self, path):
+        return write_keys(path, self._inorder(self.root))
+
+    # Method to rebuild a tree saved by dump() - one read into an array, then a balanced build in O(n)
+    # The file is already sorted, so the values skip the order checks from_sorted makes
+    # (key_file.MappedSortedKeys serves lookups from the file without building a tree at all)
+    @classmethod
+    def load(cls, path):
+        keys = read_keys(path)
+        tree = cls()
+        tree.root = tree._build_balanced(keys, 0, len(keys))
+        tree.size = len(keys)
+        return tree
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
@@ -173,74 +264,14 @@ def measure_time(func, *args, **kwargs):
     execution_time = end_time - start_time
     return execution_time
 
-# Function to write performance results to a CSV file
-def save_performance_to_csv(results, filename="BSTperformance_results.csv"):
-    with open(filename, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        # Write headers if the file is empty
-        file.seek(0, 2)  # Move to the end of the file
-        if file.tell() == 0:
-            writer.writerow(["Size", "Operation", "Time"])
-        
-        # Write the results
-        for result in results:
-            writer.writerow(result)
-
-# Function to perform tests on the BST for each operation
-def test_bst_operations(bst, shuffled_integers, size):
-    results = []
-    
-    # Insertion test
-    perf_time_insert = measure_time(bst.insert, shuffled_integers)
-    results.append([size, "Insert", f"{perf_time_insert:.8f}"])
-
-    # Maximum test (find maximum)
-    perf_time_max = measure_time(bst.maximum)
-    results.append([size, "Max", f"{perf_time_max:.8f}"])
-
-    # Traversal test (inorder traversal)
-    perf_time_traverse = measure_time(bst.traverse)
-    results.append([size, "Traverse", f"{perf_time_traverse:.8f}"])
-
-    # Deletion test (delete each element one by one)
-    perf_time_delete = measure_time(delete_all_nodes, bst)
-    results.append([size, "Delete", f"{perf_time_delete:.8f}"])
-
-    return results
-
-# Helper function to delete all nodes
-def delete_all_nodes(bst):
-    while bst.root is not None:
-        bst.delete(bst.root.value)
-
-# Main function to run the tests for different sizes
-def run_tests():
-    test_files = {
-        100: "Binary Search Tree Project\\test100.csv",
-        1000: "Binary Search Tree Project\\test1000.csv",
-        10000: "Binary Search Tree Project\\test10000.csv",
-        100000: "Binary Search Tree Project\\test100000.csv"
-    }
-
-    # Initialize an empty list to store all results
-    all_results = []
-
-    # Loop through each test file and size
-    for size, test_file in test_files.items():
-        integers = read_csv(test_file)
-        shuffled_integers = shuffle_array(integers)
-
-        # Create a BST and run the operations
-        bst = BinarySearchTree()
-        results = test_bst_operations(bst, shuffled_integers, size)
-
-        # Add the results to the all_results list
-        all_results.extend(results)
-
-    # Save all the results to a CSV file
-    save_performance_to_csv(all_results)
+# Function to run the benchmark for the BST at each size and save the labeled results (see benchmark.py)
+def run_tests(sizes=None, distributions=("shuffled",), trials=3):
+    from benchmark import run_tests as run_benchmark
+    return run_benchmark("bst", sizes, distributions, trials)
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+# Usage: python main.py [benchmark options], e.g. python main.py --sizes 1000 10000 --distributions shuffled zipfian
 if __name__ == "__main__":
-    run_tests()
\ No newline at end of file
+    import benchmark
+    benchmark.main(sys.argv[1:], default_engines=("bst",))
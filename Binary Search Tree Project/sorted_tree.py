@@ -0,0 +1,113 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Methods shared by the linked binary search trees (main.BinarySearchTree and the AVL tree)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Marks an exhausted iterator in merge_sorted - None can't, since None could be a value in the tree
+_END = object()
+
+
+# Function to merge two increasing iterables into one list in a single pass, keeping one copy of shared values
+def merge_sorted(left, right):
+    merged = []
+    left, right = iter(left), iter(right)
+    a, b = next(left, _END), next(right, _END)
+    while a is not _END and b is not _END:
+        if a < b:
+            merged.append(a)
+            a = next(left, _END)
+        elif b < a:
+            merged.append(b)
+            b = next(right, _END)
+        else:
+            merged.append(a)
+            a, b = next(left, _END), next(right, _END)
+    if a is not _END:
+        merged.append(a)
+        merged.extend(left)
+    if b is not _END:
+        merged.append(b)
+        merged.extend(right)
+    return merged
+
+
+# Mixin for trees of nodes with value, left and right, rooted at self.root
+# Each tree names its node type in node_class; a tree whose nodes store more than that (the AVL tree's
+# height and subtree size) fills those fields in _finish_built_node
+# The cursor methods only walk the nodes, so they work the same whether or not the tree rebalances
+class SortedTreeMixin:
+    node_class = None
+
+    # Method to return an inorder iterator positioned at the first value >= x
+    # Only the path down to x is put on the stack, so getting there costs O(log n) in a balanced tree
+    def seek(self, x):
+        stack = []
+        current = self.root
+        while current is not None:
+            if current.value < x:
+                current = current.right
+            else:
+                # This node and its right subtree still come after x
+                stack.append(current)
+                current = current.left
+        return self._resume_inorder(stack)
+
+    # Generator that carries on an inorder traversal from a stack of pending nodes
+    def _resume_inorder(self, stack):
+        while stack:
+            node = stack.pop()
+            yield node.value
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    # Generator over the values between lo and hi (both included) in sorted order, in O(log n + k) for k values
+    def iter_range(self, lo, hi):
+        for value in self.seek(lo):
+            if value > hi:
+                return
+            yield value
+
+    # Method to build a perfectly balanced tree from values in increasing order in O(n)
+    # Repeated values are skipped, as insert would; anything out of order raises ValueError
+    @classmethod
+    def from_sorted(cls, iterable):
+        values = []
+        for value in iterable:
+            if values and value <= values[-1]:
+                if value == values[-1]:
+                    continue
+                raise ValueError(f"from_sorted needs increasing values, got {value} after {values[-1]}")
+            values.append(value)
+        tree = cls()
+        tree.root = tree._build_balanced(values, 0, len(values))
+        tree.size = len(values)
+        return tree
+
+    # Recursive method to build a balanced subtree from values[low:high] - the middle value becomes the root
+    # The recursion is only log2(n) deep because both halves are the same size
+    def _build_balanced(self, values, low, high):
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        node = self.node_class(values[middle])
+        node.left = self._build_balanced(values, low, middle)
+        node.right = self._build_balanced(values, middle + 1, high)
+        self._finish_built_node(node, high - low)
+        return node
+
+    # Hook called on each node _build_balanced makes, once both subtrees are attached
+    # count is the number of nodes in the subtree; plain nodes have nothing more to fill in
+    def _finish_built_node(self, node, count):
+        pass
+
+    # Method to remove every value at once, dropping the root instead of deleting node by node
+    def clear(self):
+        self.root = None
+        self.size = 0
+
+    # Method to return a new tree holding the values of this tree and another one
+    # Both inorder sequences are merged in one pass and the result is built with from_sorted, so it takes O(n + m)
+    def merge(self, other):
+        return type(self).from_sorted(merge_sorted(self, other))
@@ -0,0 +1,282 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Benchmark harness for the hash table engines
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Example runs:
+#   python benchmark.py                                   # the bundled 10/100/1000 entry datasets
+#   python benchmark.py --sizes 1000 100000 1000000 --trials 7 --engines chaining robinhood
+#   python benchmark.py --sizes 100000 --buckets 10 1000 100000 --ordered
+#   python benchmark.py --sizes 100000 --engines chaining --hash builtin fnv1a fibonacci mask
+#   python benchmark.py --sizes 100000 --bloom 0.01     # also run with a Bloom filter and compare misses
+
+import argparse, csv, gc, os, random, time
+from time import perf_counter_ns
+from main import ENGINES, load_dataset, registration_key
+from hash_functions import HASH_STRATEGIES
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Joseph", "Susan", "Thomas", "Karen",
+               "Charles", "Nancy", "Christopher", "Sarah", "Daniel", "Lisa", "Matthew", "Betty"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Martin",
+              "Lee", "Thompson", "White", "Harris", "Clark", "Lewis", "Robinson", "Walker"]
+STATES = ["Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut",
+          "Delaware", "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa",
+          "Kansas", "Kentucky", "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan",
+          "Minnesota", "Mississippi", "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire",
+          "New Jersey", "New Mexico", "New York", "North Carolina", "North Dakota", "Ohio",
+          "Oklahoma", "Oregon", "Pennsylvania", "Rhode Island", "South Carolina", "South Dakota",
+          "Tennessee", "Texas", "Utah", "Vermont", "Virginia", "Washington", "West Virginia",
+          "Wisconsin", "Wyoming"]
+
+# Bundled datasets used when no sizes are given, matching the original 10/100/1000 runs
+BUNDLED_DATASETS = [10, 100, 1000]
+# Number of single lookups timed one at a time for the per-operation latency percentiles
+LATENCY_SAMPLE = 20000
+
+# Columns of every row written by the harness
+# The distribution columns come from the table's stats(): chain lengths for chaining, probe lengths otherwise
+RESULT_FIELDS = ["engine", "hash", "bloom", "entries", "buckets", "operation", "trials", "min_s", "median_s",
+                 "p90_s", "p99_s", "per_op_ns", "op_p50_ns", "op_p99_ns", "op_max_ns", "capacity", "load_factor", "resizes", "ordered",
+                 "occupied", "length_kind", "max_length", "mean_length", "hash_ns_per_key", "histogram"]
+
+
+# Generator of synthetic registrations in the same shape as the bundled JSON datasets
+# With distinct=True an attendee number is added so every key is unique, however many are asked for
+def generate_registrations(count, seed=0, distinct=True):
+    rng = random.Random(seed)
+    for number in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if distinct:
+            name = f"{name} {number}"
+        yield {'name': name, 'state': rng.choice(STATES)}
+
+
+# Load a bundled dataset by size, resolving the path next to this file
+def bundled_dataset(size):
+    return load_dataset(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     f"{size}_entries_realistic.json"))
+
+
+# Value at a fraction (0 to 1) of the way through a sorted list, interpolating between neighbours
+def percentile(sorted_values, fraction):
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+# Time one call of func, with the garbage collector paused unless keep_gc is set
+def timed_call(func, keep_gc=False):
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if not keep_gc:
+        gc.disable()
+    try:
+        start_time = time.perf_counter()
+        result = func()
+        end_time = time.perf_counter()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return result, end_time - start_time
+
+
+# Time lookups one at a time and return the sorted latencies in nanoseconds
+# Shows the tail (p99, worst case) that whole-trial times average away
+def lookup_latencies(hash_table, keys, keep_gc=False):
+    sample = keys if len(keys) <= LATENCY_SAMPLE else random.Random(0).sample(keys, LATENCY_SAMPLE)
+    retrieve = hash_table.retrieve
+    latencies = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if not keep_gc:
+        gc.disable()
+    try:
+        for key in sample:
+            start_time = perf_counter_ns()
+            retrieve(key)
+            latencies.append(perf_counter_ns() - start_time)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    latencies.sort()
+    return latencies
+
+
+# Summarize the trial times of one operation as a labeled row, next to the table's distribution stats
+# latencies (single-lookup times in ns) fill the op_ columns for the lookup operations
+def summarize(engine, entries, buckets, operation, times, hash_table, ordered, stats, latencies=None):
+    times = sorted(times)
+    median = percentile(times, 0.5)
+    return {
+        "engine": engine,
+        "hash": hash_table.hash_strategy.name if hash_table.pluggable_hash else "builtin",
+        "bloom": hash_table.bloom.false_positive_rate if hash_table.bloom is not None else "",
+        "entries": entries,
+        "buckets": buckets,
+        "operation": operation,
+        "trials": len(times),
+        "min_s": f"{times[0]:.9f}",
+        "median_s": f"{median:.9f}",
+        "p90_s": f"{percentile(times, 0.9):.9f}",
+        "p99_s": f"{percentile(times, 0.99):.9f}",
+        "per_op_ns": f"{median / max(entries, 1) * 1e9:.1f}",
+        "op_p50_ns": percentile(latencies, 0.5) if latencies else "",
+        "op_p99_ns": percentile(latencies, 0.99) if latencies else "",
+        "op_max_ns": latencies[-1] if latencies else "",
+        "capacity": hash_table.capacity(),
+        "load_factor": f"{hash_table.load_factor():.3f}",
+        "resizes": hash_table.resize_count,
+        "ordered": ordered,
+        "occupied": f"{stats['occupied']:.3f}",
+        "length_kind": stats['kind'],
+        "max_length": stats['max_length'],
+        "mean_length": f"{stats['mean_length']:.3f}",
+        "hash_ns_per_key": f"{stats['hash_ns_per_key']:.1f}",
+        "histogram": " ".join(f"{length}:{count}" for length, count in stats['histogram'].items()),
+    }
+
+
+# Benchmark insert, retrieve (hits and misses) and sorted read for one engine, dataset and bucket count
+# Every trial builds a fresh table; the warmup trials run first and are not recorded
+# hash_strategy only applies to engines with pluggable hashing; the others always use hash()
+# bloom_rate puts a Bloom filter with that false positive rate in front of the table
+def benchmark_engine(engine, items, buckets, trials=5, warmup=1, keep_gc=False, ordered=False,
+                     hash_strategy="builtin", bloom_rate=None):
+    table_class = ENGINES[engine]
+    options = {"ordered": ordered}
+    if table_class.pluggable_hash:
+        options["hash_strategy"] = hash_strategy
+    if bloom_rate:
+        options["expected_entries"] = len(items)
+        options["false_positive_rate"] = bloom_rate
+    keys = [key for key, _ in items]
+    # Walk-ups who never registered: same shape of key, never in the table
+    missing_keys = [f"Walk-up {number} (Nowhere)" for number in range(len(keys))]
+    times = {"Insert": [], "Retrieve": [], "Miss": [], "Sort": []}
+    hash_table = None
+    for trial in range(warmup + trials):
+        hash_table = table_class(buckets, **options)
+        _, insert_time = timed_call(lambda: hash_table.insert_many(items), keep_gc)
+        retrieve = hash_table.retrieve
+        _, retrieve_time = timed_call(lambda: [retrieve(key) for key in keys], keep_gc)
+        _, miss_time = timed_call(lambda: [retrieve(key) for key in missing_keys], keep_gc)
+        _, sort_time = timed_call(hash_table.sorted_items, keep_gc)
+        if trial >= warmup:
+            times["Insert"].append(insert_time)
+            times["Retrieve"].append(retrieve_time)
+            times["Miss"].append(miss_time)
+            times["Sort"].append(sort_time)
+    stats = hash_table.stats()
+    latencies = {"Retrieve": lookup_latencies(hash_table, keys, keep_gc),
+                 "Miss": lookup_latencies(hash_table, missing_keys, keep_gc)}
+    return [summarize(engine, len(items), buckets, operation, operation_times, hash_table, ordered, stats,
+                      latencies.get(operation))
+            for operation, operation_times in times.items()]
+
+
+# Print one result row to the console
+def print_row(row):
+    bloom = f" bloom {row['bloom']}" if row['bloom'] != "" else ""
+    latency = f", single lookup p50 {row['op_p50_ns']:.0f} ns p99 {row['op_p99_ns']:.0f} ns" if row['op_p99_ns'] != "" else ""
+    print(f"{row['engine']:>10} {row['hash']:>9}{bloom} {row['entries']:>9} entries "
+          f"{row['buckets']:>9} buckets {row['operation']:>8}: "
+          f"median {float(row['median_s']):.6f}s p90 {float(row['p90_s']):.6f}s "
+          f"({row['per_op_ns']} ns/op{latency}, capacity {row['capacity']}, "
+          f"load factor {row['load_factor']}, {row['resizes']} resize(s), "
+          f"max {row['length_kind']} {row['max_length']}, "
+          f"mean {row['length_kind']} {row['mean_length']}, "
+          f"hash {row['hash_ns_per_key']} ns/key)")
+
+
+# Run every engine over every dataset and bucket count, printing each row as it finishes
+# datasets is a list of registration lists; bucket_counts=None gives each table one bucket per entry
+# With bloom_rate set, each engine also runs with a Bloom filter and the miss-path speedup is printed
+def run_benchmark(datasets, engines, bucket_counts=None, trials=5, warmup=1, keep_gc=False, ordered=False,
+                  hash_strategies=("builtin",), bloom_rate=None):
+    rows = []
+    for entries in datasets:
+        items = [(registration_key(entry), entry) for entry in entries]
+        for buckets in bucket_counts or [max(1, len(items))]:
+            for engine in engines:
+                # Engines without pluggable hashing run once, whatever strategies were asked for
+                strategies = hash_strategies if ENGINES[engine].pluggable_hash else hash_strategies[:1]
+                for hash_strategy in strategies:
+                    miss_times = []
+                    for rate in [None, bloom_rate] if bloom_rate else [None]:
+                        for row in benchmark_engine(engine, items, buckets, trials, warmup, keep_gc, ordered,
+                                                    hash_strategy, rate):
+                            print_row(row)
+                            rows.append(row)
+                            if row['operation'] == "Miss":
+                                miss_times.append(float(row['median_s']))
+                    if len(miss_times) == 2:
+                        print(f"{engine:>10} {hash_strategy:>9} Bloom filter miss-path speedup: "
+                              f"{miss_times[0] / miss_times[1]:.2f}x")
+            print_tail_latency(rows, len(items), buckets)
+    return rows
+
+
+# Compare each engine's p99 single-lookup latency with the chaining table's for one dataset and bucket count
+def print_tail_latency(rows, entries, buckets):
+    p99 = {(row['engine'], row['hash'], row['bloom']): row['op_p99_ns'] for row in rows
+           if row['entries'] == entries and row['buckets'] == buckets and row['operation'] == "Retrieve"}
+    baseline = p99.get(("chaining", "builtin", ""))
+    if not baseline:
+        return
+    for (engine, hash_name, bloom), value in p99.items():
+        bloom_label = f" bloom {bloom}" if bloom != "" else ""
+        print(f"{engine:>10} {hash_name:>9}{bloom_label} p99 retrieve latency: {value:.0f} ns "
+              f"({value / baseline:.2f}x chaining)")
+
+
+# Function to append labeled rows to a CSV file, writing the header when the file is new
+def save_results(file_name, rows, fields=RESULT_FIELDS):
+    file_exists = os.path.exists(file_name) and os.path.getsize(file_name) > 0
+    with open(file_name, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(rows)
+    print(f"Performance data saved to {file_name}")
+
+
+# Command line options shared by the harness and main.py
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hash table engines.")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="synthetic dataset sizes (default: the bundled 10/100/1000 entry files)")
+    parser.add_argument("--buckets", type=int, nargs="+",
+                        help="initial bucket counts to try (default: one bucket per entry)")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--hash", nargs="+", default=["builtin"], choices=list(HASH_STRATEGIES),
+                        help="hash strategies for engines with pluggable hashing")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-gc", action="store_true", help="leave the garbage collector on while timing")
+    parser.add_argument("--ordered", action="store_true", help="keep a sorted key index beside each table")
+    parser.add_argument("--bloom", type=float, metavar="RATE",
+                        help="also run with a Bloom filter at this false positive rate and compare misses")
+    parser.add_argument("--output", default="performance_data.csv")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    options = parse_arguments(arguments)
+    if options.sizes:
+        datasets = [list(generate_registrations(size, options.seed)) for size in options.sizes]
+    else:
+        datasets = [bundled_dataset(size) for size in BUNDLED_DATASETS]
+    rows = run_benchmark(datasets, options.engines, options.buckets, options.trials, options.warmup,
+                         options.keep_gc, options.ordered, options.hash, options.bloom)
+    save_results(options.output, rows)
+    return rows
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Counting Bloom filter that lets a hash table answer definite misses without touching its buckets
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import math
+
+MASK_64 = (1 << 64) - 1
+# 2^64 divided by the golden ratio, used to scramble hash() before splitting it in two
+GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+# Counters stop at this value; a saturated counter is never decremented, so it can't cause a false miss
+MAX_COUNT = 255
+
+
+# Bloom filter with a small counter per position instead of a bit, so keys can be removed again
+# "key in filter" is False only when the key was definitely never added
+class CountingBloomFilter:
+    # Size the filter for expected_entries keys at the given false positive rate
+    def __init__(self, expected_entries, false_positive_rate=0.01):
+        expected_entries = max(1, expected_entries)
+        self.num_counters = max(8, math.ceil(-expected_entries * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_counters / expected_entries * math.log(2)))
+        self.counters = bytearray(self.num_counters)
+        self.expected_entries = expected_entries
+        self.false_positive_rate = false_positive_rate
+
+    # Counter positions for a key, by double hashing: position i is h1 + i * h2
+    def _positions(self, key):
+        mixed = (hash(key) * GOLDEN_RATIO_64) & MASK_64
+        h1 = mixed >> 32
+        h2 = (mixed & 0xFFFFFFFF) | 1
+        num_counters = self.num_counters
+        return [(h1 + i * h2) % num_counters for i in range(self.num_hashes)]
+
+    # Method to add a key (call once per distinct key, not on every overwrite)
+    def add(self, key):
+        counters = self.counters
+        for position in self._positions(key):
+            if counters[position] < MAX_COUNT:
+                counters[position] += 1
+
+    # Method to remove a key that was added before
+    def remove(self, key):
+        counters = self.counters
+        for position in self._positions(key):
+            if 0 < counters[position] < MAX_COUNT:
+                counters[position] -= 1
+
+    # A key might be present only if every one of its counters is non-zero
+    # Stops at the first zero counter, so most misses cost a single probe
+    def __contains__(self, key):
+        mixed = (hash(key) * GOLDEN_RATIO_64) & MASK_64
+        position = mixed >> 32
+        step = (mixed & 0xFFFFFFFF) | 1
+        counters, num_counters = self.counters, self.num_counters
+        for _ in range(self.num_hashes):
+            if not counters[position % num_counters]:
+                return False
+            position += step
+        return True
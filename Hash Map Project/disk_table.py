@@ -0,0 +1,314 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Persistent hash table for registration data that is larger than memory
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# The table lives in two files next to each other:
+#   <path>.idx - memory-mapped slot directory: a header, then one (key hash, record offset) slot per entry
+#   <path>.dat - append-only record heap: a header, then one record per insert
+# A record is written, then committed in the directory header (heap length and key count), and only then
+# does its slot point at it. A crash before the commit leaves a record past the committed length, which is
+# cut off on the next open; a crash after it leaves an unreferenced record and a key count one too high,
+# both put right by the next compact() or resize, which recount the slots.
+
+import json, mmap, os, struct, sys, zlib
+from hashlib import blake2b
+from main import BaseHashTable, registration_items, stream_dataset
+
+INDEX_MAGIC = b"HMIDX001"
+HEAP_MAGIC = b"HMDAT001"
+# Directory header: magic, number of slots, number of keys, committed heap length, heap id
+INDEX_HEADER = struct.Struct("<8sQQQ8s8x")
+# Slot: key hash, record offset in the heap (0 marks an empty slot)
+SLOT = struct.Struct("<QQ")
+# Heap header: magic, heap id
+HEAP_HEADER = struct.Struct("<8s8s")
+# Record header: CRC-32 of key and value, key length, value length
+RECORD_HEADER = struct.Struct("<III")
+# The directory doubles once more than this fraction of slots are in use
+MAX_LOAD_FACTOR = 0.7
+
+
+# Stable 64-bit hash of a key; the built-in hash() changes between runs, so it can't be stored on disk
+def stable_hash(key_bytes):
+    return int.from_bytes(blake2b(key_bytes, digest_size=8).digest(), 'little')
+
+
+# Hash table stored on disk with the same insert/retrieve API as HashTable
+class DiskHashTable(BaseHashTable):
+    # Open the table at path, creating it with num_slots slots if it doesn't exist yet
+    # With sync=True every insert is flushed to the disk before it returns (slower, survives power loss)
+    def __init__(self, path, num_slots=1024, sync=False):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.heap_path = path + ".dat"
+        self.sync = sync
+        self.index = None
+        self.resize_count = 0
+        if not os.path.exists(self.heap_path):
+            self._create(num_slots)
+        elif not os.path.exists(self.index_path):
+            self._rebuild_index(num_slots)
+        self._open()
+
+    # Create an empty heap and directory
+    def _create(self, num_slots):
+        heap_id = os.urandom(8)
+        with open(self.heap_path, 'wb') as heap:
+            heap.write(HEAP_HEADER.pack(HEAP_MAGIC, heap_id))
+            heap.flush()
+            os.fsync(heap.fileno())
+        self._write_index(self.index_path, self._slot_count_for(num_slots), [], 0,
+                          HEAP_HEADER.size, heap_id)
+
+    # Round a slot count up to a power of two so a mask can pick the home slot
+    def _slot_count_for(self, num_entries):
+        num_slots = 16
+        while num_slots * MAX_LOAD_FACTOR < num_entries:
+            num_slots *= 2
+        return num_slots
+
+    # Write a complete directory to a temporary file, then swap it in with an atomic rename
+    def _write_index(self, index_path, num_slots, slots, count, heap_length, heap_id):
+        temporary_path = index_path + ".tmp"
+        directory = bytearray(INDEX_HEADER.size + num_slots * SLOT.size)
+        INDEX_HEADER.pack_into(directory, 0, INDEX_MAGIC, num_slots, count, heap_length, heap_id)
+        mask = num_slots - 1
+        for key_hash, offset in slots:
+            slot = key_hash & mask
+            while SLOT.unpack_from(directory, INDEX_HEADER.size + slot * SLOT.size)[1] != 0:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(directory, INDEX_HEADER.size + slot * SLOT.size, key_hash, offset)
+        with open(temporary_path, 'wb') as file:
+            file.write(directory)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, index_path)
+
+    # Map both files and check that the directory belongs to the heap next to it
+    def _open(self):
+        self.heap_file = open(self.heap_path, 'r+b')
+        magic, heap_id = HEAP_HEADER.unpack(self.heap_file.read(HEAP_HEADER.size))
+        if magic != HEAP_MAGIC:
+            raise ValueError(f"'{self.heap_path}' is not a hash table heap file")
+        self.index_file = open(self.index_path, 'r+b')
+        self.directory = mmap.mmap(self.index_file.fileno(), 0)
+        magic, self.num_buckets, self.size, heap_length, index_heap_id = INDEX_HEADER.unpack_from(self.directory, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"'{self.index_path}' is not a hash table directory file")
+
+        # A crash part-way through compaction can leave the new heap beside the old directory
+        if index_heap_id != heap_id:
+            self.directory.close()
+            self.index_file.close()
+            self.heap_file.close()
+            self._rebuild_index(self.num_buckets)
+            return self._open()
+
+        # Cut off any record that was appended but never committed before a crash
+        if os.path.getsize(self.heap_path) != heap_length:
+            self.heap_file.truncate(heap_length)
+        self.heap_length = heap_length
+        self.heap_id = heap_id
+        self.mask = self.num_buckets - 1
+        self.heap = mmap.mmap(self.heap_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Scan the heap record by record and write a fresh directory for it
+    # Used to recover when the directory is missing or doesn't match the heap
+    def _rebuild_index(self, num_slots):
+        slots = {}
+        with open(self.heap_path, 'rb') as heap:
+            data = mmap.mmap(heap.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, heap_id = HEAP_HEADER.unpack_from(data, 0)
+        if magic != HEAP_MAGIC:
+            raise ValueError(f"'{self.heap_path}' is not a hash table heap file")
+        offset = HEAP_HEADER.size
+        while offset + RECORD_HEADER.size <= len(data):
+            checksum, key_length, value_length = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            end = start + key_length + value_length
+            # Stop at the first torn or corrupt record: everything after it was never committed
+            if end > len(data) or zlib.crc32(data[start:end]) != checksum:
+                break
+            # Later records for the same key replace earlier ones
+            slots[data[start:start + key_length]] = offset
+            offset = end
+        data.close()
+        entries = [(stable_hash(key_bytes), record_offset) for key_bytes, record_offset in slots.items()]
+        self._write_index(self.index_path, self._slot_count_for(max(num_slots, len(entries) + 1)),
+                          entries, len(entries), offset, heap_id)
+
+    # Generator over the (slot number, key hash, record offset) of every filled slot
+    def _filled_slots(self):
+        directory = self.directory
+        for slot in range(self.num_buckets):
+            key_hash, offset = SLOT.unpack_from(directory, INDEX_HEADER.size + slot * SLOT.size)
+            if offset:
+                yield slot, key_hash, offset
+
+    # Find the slot holding a key, or the empty slot where it would go
+    def _find_slot(self, key_hash, key_bytes):
+        directory, mask = self.directory, self.mask
+        slot = key_hash & mask
+        while True:
+            slot_hash, offset = SLOT.unpack_from(directory, INDEX_HEADER.size + slot * SLOT.size)
+            if offset == 0:
+                return slot, 0
+            if slot_hash == key_hash and self._read_key(offset) == key_bytes:
+                return slot, offset
+            slot = (slot + 1) & mask
+
+    # Make sure the read-only heap map covers everything written so far
+    def _map_heap(self, end):
+        if end > len(self.heap):
+            self.heap.close()
+            self.heap = mmap.mmap(self.heap_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Read the key stored in the record at offset
+    def _read_key(self, offset):
+        self._map_heap(offset + RECORD_HEADER.size)
+        _, key_length, _ = RECORD_HEADER.unpack_from(self.heap, offset)
+        start = offset + RECORD_HEADER.size
+        self._map_heap(start + key_length)
+        return self.heap[start:start + key_length]
+
+    # Read the (key, value) stored in the record at offset
+    def _read_record(self, offset):
+        self._map_heap(offset + RECORD_HEADER.size)
+        _, key_length, value_length = RECORD_HEADER.unpack_from(self.heap, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + key_length + value_length
+        self._map_heap(end)
+        key = self.heap[start:start + key_length].decode('utf-8')
+        return key, json.loads(self.heap[start + key_length:end])
+
+    # Method to insert a key-value pair into the hash table
+    def insert(self, key, value):
+        key_bytes = key.encode('utf-8')
+        value_bytes = json.dumps(value).encode('utf-8')
+        key_hash = stable_hash(key_bytes)
+        slot, old_offset = self._find_slot(key_hash, key_bytes)
+        # Only a new key takes a slot, so only a new key can push the directory over the load limit
+        if old_offset == 0 and self.size + 1 > self.num_buckets * MAX_LOAD_FACTOR:
+            self.reserve(self.size * 2)
+            slot, old_offset = self._find_slot(key_hash, key_bytes)
+
+        # 1. Append the record to the end of the heap
+        offset = self.heap_length
+        self.heap_file.seek(offset)
+        self.heap_file.write(RECORD_HEADER.pack(zlib.crc32(key_bytes + value_bytes),
+                                                len(key_bytes), len(value_bytes)))
+        self.heap_file.write(key_bytes)
+        self.heap_file.write(value_bytes)
+        self.heap_file.flush()
+        if self.sync:
+            os.fsync(self.heap_file.fileno())
+
+        # 2. Commit the new heap length (and key count), then 3. point the slot at the record
+        self.heap_length = self.heap_file.tell()
+        position = INDEX_HEADER.size + slot * SLOT.size
+        if old_offset == 0:
+            struct.pack_into("<Q", self.directory, position, key_hash)
+            self.size += 1
+        self._write_header()
+        # The offset goes in last: until it is written the slot still reads as empty (or as the old record)
+        struct.pack_into("<Q", self.directory, position + 8, offset)
+        if self.sync:
+            self.directory.flush()
+
+    # Write the key count and committed heap length into the directory header
+    def _write_header(self):
+        INDEX_HEADER.pack_into(self.directory, 0, INDEX_MAGIC, self.num_buckets, self.size,
+                               self.heap_length, self.heap_id)
+
+    # Method to retrieve a value based on a key
+    def retrieve(self, key):
+        key_bytes = key.encode('utf-8')
+        _, offset = self._find_slot(stable_hash(key_bytes), key_bytes)
+        if offset == 0:
+            return None
+        return self._read_record(offset)[1]
+
+    # Method to grow the directory so num_entries keys fit under the load limit
+    # Slots keep their cached hashes, so growing never reads the heap
+    def reserve(self, num_entries):
+        num_slots = self._slot_count_for(num_entries + 1)
+        if num_slots <= self.num_buckets:
+            return
+        entries = [(key_hash, offset) for _, key_hash, offset in self._filled_slots()]
+        self._close_files()
+        self._write_index(self.index_path, num_slots, entries, len(entries), self.heap_length, self.heap_id)
+        self._open()
+        self.resize_count += 1
+
+    # Method to return every key-value pair in the hash table, in slot order
+    def items(self):
+        return [self._read_record(offset) for _, _, offset in self._filled_slots()]
+
+    # Method to rewrite the heap with only the latest record for each key, dropping overwritten ones
+    def compact(self):
+        heap_id = os.urandom(8)
+        temporary_path = self.heap_path + ".tmp"
+        entries = []
+        self._map_heap(self.heap_length)
+        with open(temporary_path, 'wb') as new_heap:
+            new_heap.write(HEAP_HEADER.pack(HEAP_MAGIC, heap_id))
+            for _, key_hash, offset in self._filled_slots():
+                _, key_length, value_length = RECORD_HEADER.unpack_from(self.heap, offset)
+                end = offset + RECORD_HEADER.size + key_length + value_length
+                entries.append((key_hash, new_heap.tell()))
+                new_heap.write(self.heap[offset:end])
+            heap_length = new_heap.tell()
+            new_heap.flush()
+            os.fsync(new_heap.fileno())
+        old_length = self.heap_length
+        self._close_files()
+        # Swap in the new heap, then its directory; if we crash in between, the heap ids won't
+        # match on the next open and the directory is rebuilt from the new heap
+        os.replace(temporary_path, self.heap_path)
+        self._write_index(self.index_path, self.num_buckets, entries, len(entries), heap_length, heap_id)
+        self._open()
+        return old_length - heap_length
+
+    # Unmap and close both files
+    def _close_files(self):
+        self.heap.close()
+        self.directory.flush()
+        self.directory.close()
+        self.index_file.close()
+        self.heap_file.close()
+
+    # Method to flush everything to the disk and close the files
+    def close(self):
+        self.directory.flush()
+        os.fsync(self.heap_file.fileno())
+        self._close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Main execution
+# Usage:
+#   python disk_table.py load <table path> <registration JSON or JSON-lines file>
+#   python disk_table.py get <table path> "<name> (<state>)"
+#   python disk_table.py compact <table path>
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("load", "get", "compact"):
+        print("Usage: python disk_table.py load|get|compact <table path> [file or key]")
+        sys.exit(1)
+    command, path = sys.argv[1], sys.argv[2]
+
+    with DiskHashTable(path) as table:
+        if command == "load":
+            count = table.insert_many(registration_items(stream_dataset(sys.argv[3])))
+            print(f"Loaded {count} registrations into '{path}' ({table.size} keys)")
+        elif command == "get":
+            print(table.retrieve(sys.argv[3]))
+        else:
+            reclaimed = table.compact()
+            print(f"Compacted '{path}': reclaimed {reclaimed} bytes")
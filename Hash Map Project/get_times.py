@@ -4,61 +4,43 @@
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Import pandas and matplotlib to plot performance data
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# Load performance data from the .txt file (with a CSV-like format)
-df = pd.read_csv('performance_data.txt', header=None, names=['Insert Time', 'Sort Time', 'Data Set Size'])
+# Load the labeled rows written by benchmark.py (optionally from another file given on the command line)
+file_name = sys.argv[1] if len(sys.argv) > 1 else 'performance_data.csv'
+df = pd.read_csv(file_name)
 
 # Convert the columns to numeric values (in case they are read as strings)
-df['Insert Time'] = pd.to_numeric(df['Insert Time'], errors='coerce')
-df['Sort Time'] = pd.to_numeric(df['Sort Time'], errors='coerce')
-df['Data Set Size'] = pd.to_numeric(df['Data Set Size'], errors='coerce')
-
-# Group the data by 'Data Set Size' and calculate the mean for Insert Time and Sort Time
-means = df.groupby('Data Set Size').agg({'Insert Time': 'mean', 'Sort Time': 'mean'}).reset_index()
-
-# Set up the plot
-plt.figure(figsize=(10, 6))
-
-# Create an x-axis for the three data set sizes (10, 100, 1000) evenly spaced
-x = [0, 1, 2]
-
-# Map dataset sizes to the x-axis positions
-data_set_sizes = [10, 100, 1000]
-position_mapping = dict(zip(data_set_sizes, x))
-
-# Plot Insert Time (shifted slightly to the left)
-insert_bars = plt.bar([position_mapping[10], position_mapping[100], position_mapping[1000]], 
-                      means['Insert Time'], width=0.3, label='Insert Time', color='b')
-
-# Plot Sort Time (shifted slightly to the right)
-sort_bars = plt.bar(
-    [pos + 0.3 for pos in [position_mapping[10], position_mapping[100], position_mapping[1000]]], 
-    means['Sort Time'], width=0.3, label='Sort Time', color='g')
-
-# Labeling the axes
-plt.xlabel('Data Set Size')
-plt.ylabel('Time (seconds)')
-
-# Title and legend
-plt.title('Performance of Hash Table Operations by Data Set Size')
-plt.legend()
-
-# Set the x-ticks to show the actual data set sizes (10, 100, 1000)
-plt.xticks([0, 1, 2], data_set_sizes)
-
-# Display the value above each bar for Insert Time
-for bar in insert_bars:
-    yval = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width() / 2, yval, f'{yval:.6f}', ha='center', va='bottom', fontsize=8)
-
-# Display the value above each bar for Sort Time
-for bar in sort_bars:
-    yval = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width() / 2, yval, f'{yval:.6f}', ha='center', va='bottom', fontsize=8)
+for column in ['entries', 'buckets', 'median_s', 'p90_s']:
+    df[column] = pd.to_numeric(df[column], errors='coerce')
+df = df.dropna(subset=['entries', 'median_s'])
+
+# Runs with a non-default hash strategy get their own line, e.g. "chaining/fnv1a"
+if 'hash' in df.columns:
+    df['engine'] = df['engine'].where(df['hash'].fillna('builtin') == 'builtin', df['engine'] + '/' + df['hash'])
+
+# Average repeated runs of the same engine, operation and data set size
+means = df.groupby(['operation', 'engine', 'entries']).agg({'median_s': 'mean', 'p90_s': 'mean'}).reset_index()
+
+# One panel per operation, one line per engine, with whatever data set sizes are in the file
+operations = list(means['operation'].unique())
+fig, axes = plt.subplots(1, len(operations), figsize=(6 * len(operations), 5), squeeze=False)
+for ax, operation in zip(axes[0], operations):
+    operation_means = means[means['operation'] == operation]
+    for engine, engine_means in operation_means.groupby('engine'):
+        ax.plot(engine_means['entries'], engine_means['median_s'], marker='o', label=f'{engine} (median)')
+        ax.fill_between(engine_means['entries'], engine_means['median_s'], engine_means['p90_s'], alpha=0.2)
+
+    # Labeling the axes
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Data Set Size')
+    ax.set_ylabel('Time (seconds)')
+    ax.set_title(f'{operation} Time by Data Set Size')
+    ax.legend()
 
 # Display the plot
 plt.tight_layout()
 plt.show()
-
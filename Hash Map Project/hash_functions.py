@@ -0,0 +1,77 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Hash strategies the chaining HashTable can use to map keys to buckets
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+MASK_64 = (1 << 64) - 1
+# 64-bit FNV-1a constants
+FNV_OFFSET_BASIS = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+# 2^64 divided by the golden ratio, used by Fibonacci hashing
+GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+
+
+# Python's built-in hash() reduced with modulo, the original HashTable behavior
+class BuiltinHash:
+    name = "builtin"
+    power_of_two = False
+
+    def bucket(self, key, num_buckets):
+        return hash(key) % num_buckets
+
+
+# FNV-1a over the UTF-8 bytes of the key; stable between runs, unlike hash() on strings
+class FNV1aHash:
+    name = "fnv1a"
+    power_of_two = False
+
+    def hash(self, key):
+        value = FNV_OFFSET_BASIS
+        for byte in str(key).encode('utf-8'):
+            value = ((value ^ byte) * FNV_PRIME) & MASK_64
+        return value
+
+    def bucket(self, key, num_buckets):
+        return self.hash(key) % num_buckets
+
+
+# Fibonacci (multiplicative) hashing: scramble hash() with the golden ratio and keep the high bits
+# Multiplying the 64-bit product by the bucket count and shifting maps it onto any number of buckets
+class FibonacciHash:
+    name = "fibonacci"
+    power_of_two = False
+
+    def bucket(self, key, num_buckets):
+        return (((hash(key) * GOLDEN_RATIO_64) & MASK_64) * num_buckets) >> 64
+
+
+# Keep only the low bits of hash() with a mask; needs a power-of-two bucket count
+# Fast, but every bit above the mask is thrown away, so patterned keys can pile up in a few buckets
+class PowerOfTwoMaskHash:
+    name = "mask"
+    power_of_two = True
+
+    def bucket(self, key, num_buckets):
+        return hash(key) & (num_buckets - 1)
+
+
+# Hash strategies the benchmark and HashTable(hash_strategy=...) can choose between by name
+HASH_STRATEGIES = {strategy.name: strategy for strategy in
+                   (BuiltinHash, FNV1aHash, FibonacciHash, PowerOfTwoMaskHash)}
+
+
+# Turn a strategy name (or an already built strategy object) into a strategy object
+def get_hash_strategy(strategy):
+    if isinstance(strategy, str):
+        if strategy not in HASH_STRATEGIES:
+            raise ValueError(f"Unknown hash strategy '{strategy}'. Choose one of: {', '.join(HASH_STRATEGIES)}.")
+        return HASH_STRATEGIES[strategy]()
+    return strategy
+
+
+# Smallest power of two that is at least number
+def next_power_of_two(number):
+    power = 1
+    while power < number:
+        power *= 2
+    return power
@@ -0,0 +1,201 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Bounded least-recently-used cache for hot registration lookups
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import random, sys
+from main import BaseHashTable, HashTable, measure_runtime, registration_key, registration_items, stream_dataset
+from benchmark import bundled_dataset
+
+
+# Rough size in bytes of a key or value, counting one level into dicts, lists and tuples
+def approximate_size(obj):
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(sys.getsizeof(item) for item in obj)
+    return size
+
+
+# Entry in the recency list; the node itself is what the hash table stores for each key
+class CacheNode:
+    __slots__ = ("key", "value", "size", "prev", "next")
+
+    def __init__(self, key, value, size):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.prev = None
+        self.next = None
+
+
+# Hash table with a bounded number of entries (or bytes), evicting the least recently used first
+# The table maps each key to its node in a doubly linked recency list, so get, put and evict are all O(1)
+# On a miss the value is fetched from backing (a table with retrieve(), or any function of the key)
+class LRUHashTable(BaseHashTable):
+    # No sorted key index: print_table and sorted_items sort the cached entries
+    index = None
+
+    def __init__(self, max_entries=None, max_bytes=None, backing=None, num_buckets=64):
+        if max_entries is None and max_bytes is None:
+            raise ValueError("Give the cache a max_entries or max_bytes limit")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        if backing is not None and hasattr(backing, 'retrieve'):
+            backing = backing.retrieve
+        self.loader = backing
+        self.table = HashTable(num_buckets)
+        # Sentinel node: head.next is the most recently used entry, head.prev the least
+        self.head = CacheNode(None, None, 0)
+        self.head.prev = self.head.next = self.head
+        self.size = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Unlink a node from the recency list
+    def _unlink(self, node):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    # Link a node in as the most recently used entry
+    def _push_front(self, node):
+        head = self.head
+        node.prev = head
+        node.next = head.next
+        head.next.prev = node
+        head.next = node
+
+    # Method to look up a key, marking it as recently used
+    # Misses are filled from the backing store when there is one
+    def get(self, key):
+        node = self.table.retrieve(key)
+        if node is not None:
+            self.hits += 1
+            if self.head.next is not node:
+                self._unlink(node)
+                self._push_front(node)
+            return node.value
+        self.misses += 1
+        if self.loader is None:
+            return None
+        value = self.loader(key)
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    # Method to add or update a key, evicting least recently used entries while over the limit
+    def put(self, key, value):
+        size = approximate_size(key) + approximate_size(value) if self.max_bytes is not None else 0
+        node = self.table.retrieve(key)
+        if node is not None:
+            self.bytes += size - node.size
+            node.value = value
+            node.size = size
+            self._unlink(node)
+        else:
+            node = CacheNode(key, value, size)
+            self.table.insert(key, node)
+            self.size += 1
+            self.bytes += size
+        self._push_front(node)
+        self._evict()
+
+    # Drop entries from the least recently used end until the cache fits its limits again
+    # The newest entry always stays, even if on its own it is larger than max_bytes
+    def _evict(self):
+        head = self.head
+        while self.size > 1 and ((self.max_entries is not None and self.size > self.max_entries) or
+                                 (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            node = head.prev
+            self._unlink(node)
+            self.table.delete(node.key)
+            self.size -= 1
+            self.bytes -= node.size
+            self.evictions += 1
+
+    # Same API as the other tables
+    def insert(self, key, value):
+        self.put(key, value)
+
+    def retrieve(self, key):
+        return self.get(key)
+
+    # Method to drop a key from the cache, returning its value (None if it wasn't cached)
+    def delete(self, key):
+        node = self.table.delete(key)
+        if node is None:
+            return None
+        self._unlink(node)
+        self.size -= 1
+        self.bytes -= node.size
+        return node.value
+
+    # Method to return the cached key-value pairs from most to least recently used
+    def items(self):
+        all_items = []
+        node = self.head.next
+        while node is not self.head:
+            all_items.append((node.key, node.value))
+            node = node.next
+        return all_items
+
+    # Number of buckets in the table that maps keys to nodes
+    @property
+    def num_buckets(self):
+        return self.table.capacity()
+
+    # Method to report the hit/miss/eviction counters
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.size,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Slow backing store that re-reads the registration file for every lookup, standing in for a
+# database or a reload through load_dataset
+def file_loader(file_name):
+    def load(key):
+        for entry in stream_dataset(file_name):
+            if registration_key(entry) == key:
+                return entry
+        return None
+    return load
+
+
+# Main execution
+if __name__ == "__main__":
+    import os
+    file_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1000_entries_realistic.json")
+    registrations = bundled_dataset(1000)
+
+    # Check-in traffic: most lookups go to a small set of attendees
+    rng = random.Random(0)
+    hot = [registration_key(entry) for entry in rng.sample(registrations, 20)]
+    everyone = [registration_key(entry) for entry in registrations]
+    lookups = [rng.choice(hot) if rng.random() < 0.9 else rng.choice(everyone) for _ in range(2000)]
+
+    loader = file_loader(file_name)
+    _, uncached_time = measure_runtime(lambda: [loader(key) for key in lookups])
+    print(f"Reading the file for every lookup: {uncached_time:.6f} seconds")
+
+    for max_entries in (10, 50, 200):
+        cache = LRUHashTable(max_entries=max_entries, backing=loader)
+        _, cached_time = measure_runtime(lambda: [cache.get(key) for key in lookups])
+        print(f"LRU cache of {max_entries:>3} entries: {cached_time:.6f} seconds {cache.stats()}")
+
+    # Same traffic in front of an in-memory table, with the limit set in bytes instead
+    table = HashTable(1000)
+    table.insert_many(registration_items(registrations))
+    cache = LRUHashTable(max_bytes=16 * 1024, backing=table)
+    _, cached_time = measure_runtime(lambda: [cache.get(key) for key in lookups])
+    print(f"LRU cache of 16 KB over a HashTable: {cached_time:.6f} seconds {cache.stats()}")
@@ -3,22 +3,145 @@
 # Program to demonstrate a hash map for a conference registration
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-import json, time, csv
+import json, time, os, random
+from array import array
+from sorted_index import SortedKeyIndex
+from hash_functions import get_hash_strategy, next_power_of_two
+from bloom_filter import CountingBloomFilter
+from perfect_hash import FrozenHashTable
+
+# Number of old buckets moved into the new table on each insert while a resize is in progress
+REHASH_STEP = 4
+# Shared stand-in for a bucket that has never held an entry: a resize can then create its new table
+# in one fast list repetition instead of one list per bucket, and a bucket gets its own list on first append
+EMPTY_BUCKET = ()
+
+# Operations shared by every hash table engine, built on each engine's insert/retrieve/items
+class BaseHashTable:
+    # Whether the engine accepts a hash_strategy argument
+    pluggable_hash = False
+
+    # Method to report how many buckets (or slots) the table currently has
+    def capacity(self):
+        return self.num_buckets
+
+    # Method to report the average number of entries per bucket (or the fraction of slots in use)
+    def load_factor(self):
+        return self.size / self.num_buckets
+
+    # Method to make room for num_entries entries in total before a bulk load
+    def reserve(self, num_entries):
+        pass
+
+    # Method to build a read-only copy on a minimal perfect hash, for data that won't change again
+    def freeze(self):
+        return FrozenHashTable.build(self.items())
+
+    # Method to insert many key-value pairs from any iterable, e.g. a streaming loader
+    # count_hint lets the table grow once up front instead of resizing during the load
+    def insert_many(self, items, count_hint=None):
+        if count_hint:
+            self.reserve(self.size + count_hint)
+        insert = self.insert
+        count = 0
+        for key, value in items:
+            insert(key, value)
+            count += 1
+        return count
+
+    # Method to display the hash table to the console
+    def print_table(self):
+        # Sort by key (e.g., alphabetical order)
+        for key, value in self.sorted_items():
+            print(f"{key}: {value}")
+
+    # Method to return every key-value pair sorted by key
+    # Uses the sorted key index when the table keeps one, otherwise sorts every entry
+    def sorted_items(self):
+        if self.index is not None:
+            retrieve = self.retrieve
+            return [(key, retrieve(key)) for key in self.index]
+        return sorted(self.items(), key=lambda x: x[0])
+
+    # Method to return the key-value pairs whose keys start with a prefix, sorted by key
+    def prefix_items(self, prefix):
+        if self.index is not None:
+            return [(key, self.retrieve(key)) for key in self.index.prefix(prefix)]
+        return [item for item in self.sorted_items() if item[0].startswith(prefix)]
+
+    # Method to return the key-value pairs with low <= key <= high, sorted by key
+    def range_items(self, low, high):
+        if self.index is not None:
+            return [(key, self.retrieve(key)) for key in self.index.range(low, high)]
+        return [item for item in self.sorted_items() if low <= item[0] <= high]
+
+    # Build the stats report from the chain length of every bucket (or probe length of every key),
+    # the fraction of buckets in use and the time taken to hash every key once
+    def _stats_from(self, lengths, occupied, hash_time, kind):
+        histogram = {}
+        for length in lengths:
+            histogram[length] = histogram.get(length, 0) + 1
+        # Mean over the chains that exist; empty buckets only show up in the histogram
+        used = [length for length in lengths if length]
+        return {
+            "entries": self.size,
+            "capacity": self.capacity(),
+            "load_factor": self.load_factor(),
+            "occupied": occupied,
+            # kind says what the histogram counts: chain lengths per bucket or probe lengths per key
+            "kind": kind,
+            "histogram": dict(sorted(histogram.items())),
+            "max_length": max(lengths, default=0),
+            "mean_length": sum(used) / len(used) if used else 0.0,
+            "hash_ns_per_key": hash_time / self.size * 1e9 if self.size else 0.0,
+        }
+
 
 # Hash Table data structure
-class HashTable:
+class HashTable(BaseHashTable):
+    pluggable_hash = True
+
     # Initialize the hash table with a given number of buckets
-    def __init__(self, num_buckets):
+    # The table doubles once it holds more than max_load_factor entries per bucket (None keeps it fixed-size)
+    # With ordered=True a sorted key index is kept up to date so ordered reads don't re-sort
+    # hash_strategy picks how keys map to buckets: "builtin", "fnv1a", "fibonacci" or "mask"
+    # With expected_entries set, a counting Bloom filter sized for that many keys at false_positive_rate
+    # answers most misses in retrieve without scanning a chain
+    def __init__(self, num_buckets, max_load_factor=1.0, ordered=False, hash_strategy="builtin",
+                 expected_entries=None, false_positive_rate=0.01):
+        self.hash_strategy = get_hash_strategy(hash_strategy)
+        self.bucket_of = self.hash_strategy.bucket
+        # Masking only works when the bucket count is a power of two
+        if self.hash_strategy.power_of_two:
+            num_buckets = next_power_of_two(num_buckets)
         self.num_buckets = num_buckets
-        # Each bucket is a list for separate chaining
-        self.table = [[] for _ in range(num_buckets)]
+        self.max_load_factor = max_load_factor
+        # Each bucket is a list for separate chaining, created on its first insert
+        self.table = [EMPTY_BUCKET] * num_buckets
+        self.size = 0
+        self.resize_count = 0
+        # Buckets still waiting to be moved during an incremental resize
+        self.old_table = None
+        self.rehash_index = 0
+        self.index = SortedKeyIndex() if ordered else None
+        self.bloom = CountingBloomFilter(expected_entries, false_positive_rate) if expected_entries else None
 
-    # Simple hash function: compute the hash of the key and map it to a bucket
+    # Hash function: map the key to a bucket with the table's hash strategy
     def hash_function(self, key):
-        return hash(key) % self.num_buckets
+        return self.bucket_of(key, self.num_buckets)
 
     # Method to insert a key-value pair into the hash table
     def insert(self, key, value):
+        if self.old_table is not None:
+            self._rehash_step()
+        if self.old_table is not None:
+            # Keys in buckets that haven't been moved yet are updated where they are
+            old_bucket = self.old_table[self.bucket_of(key, len(self.old_table))]
+            if old_bucket:
+                for i, (existing_key, _) in enumerate(old_bucket):
+                    if existing_key == key:
+                        old_bucket[i] = (key, value)
+                        return
         bucket_index = self.hash_function(key)
         # Check for existing keys and update if found
         for i, (existing_key, _) in enumerate(self.table[bucket_index]):
@@ -26,27 +149,124 @@ class HashTable:
                 self.table[bucket_index][i] = (key, value)
                 return
         # Otherwise, append the new key-value pair
-        self.table[bucket_index].append((key, value))
+        bucket = self.table[bucket_index]
+        if bucket is EMPTY_BUCKET:
+            bucket = self.table[bucket_index] = []
+        bucket.append((key, value))
+        self.size += 1
+        if self.index is not None:
+            self.index.add(key)
+        if self.bloom is not None:
+            self.bloom.add(key)
+        if (self.max_load_factor is not None and self.old_table is None
+                and self.size > self.num_buckets * self.max_load_factor):
+            self._start_resize(self.num_buckets * 2)
 
     # Method to retrieve a value based on a key
     def retrieve(self, key):
+        # The Bloom filter rules out keys that were never inserted before any bucket is read
+        if self.bloom is not None and key not in self.bloom:
+            return None
         bucket_index = self.hash_function(key)
         for existing_key, value in self.table[bucket_index]:
             if existing_key == key:
                 return value
-        
+        # Keys may still be sitting in the old table while a resize is in progress
+        if self.old_table is not None:
+            for existing_key, value in self.old_table[self.bucket_of(key, len(self.old_table))]:
+                if existing_key == key:
+                    return value
+
         # Return None if the key is not found
         return None  
 
-    # Method to display the hash table to the console
-    def print_table(self):
+    # Method to remove a key from the hash table, returning its value (None if it wasn't there)
+    def delete(self, key):
+        buckets = [self.table[self.hash_function(key)]]
+        if self.old_table is not None:
+            buckets.append(self.old_table[self.bucket_of(key, len(self.old_table))])
+        for bucket in buckets:
+            for i, (existing_key, value) in enumerate(bucket):
+                if existing_key == key:
+                    del bucket[i]
+                    self.size -= 1
+                    if self.index is not None:
+                        self.index.remove(key)
+                    if self.bloom is not None:
+                        self.bloom.remove(key)
+                    return value
+        return None
+
+    # Method to grow the table up front so num_entries entries fit under the load limit
+    def reserve(self, num_entries):
+        if self.max_load_factor is None or num_entries <= self.num_buckets * self.max_load_factor:
+            return
+        num_buckets = self.num_buckets
+        while num_entries > num_buckets * self.max_load_factor:
+            num_buckets *= 2
+        # Moving everything at once is fine here: it happens before the bulk load, not during it
+        all_items = self.items()
+        self.old_table = None
+        self.num_buckets = num_buckets
+        table = self.table = [EMPTY_BUCKET] * num_buckets
+        for entry in all_items:
+            bucket_index = self.bucket_of(entry[0], num_buckets)
+            if table[bucket_index] is EMPTY_BUCKET:
+                table[bucket_index] = []
+            table[bucket_index].append(entry)
+        self.resize_count += 1
+
+    # Begin moving the entries into a larger table, a few buckets at a time
+    def _start_resize(self, num_buckets):
+        self.old_table = self.table
+        self.rehash_index = 0
+        self.num_buckets = num_buckets
+        # The new table is still O(capacity) to create, but as one list repetition of a shared empty
+        # bucket rather than one new list per bucket; the per-bucket lists, and moving the entries into
+        # them, are what get spread over the following inserts
+        self.table = [EMPTY_BUCKET] * num_buckets
+        self.resize_count += 1
+
+    # Move the next few old buckets into the new table
+    def _rehash_step(self):
+        old_table, table, num_buckets, bucket_of = self.old_table, self.table, self.num_buckets, self.bucket_of
+        stop = min(self.rehash_index + REHASH_STEP, len(old_table))
+        for old_index in range(self.rehash_index, stop):
+            for entry in old_table[old_index]:
+                new_index = bucket_of(entry[0], num_buckets)
+                if table[new_index] is EMPTY_BUCKET:
+                    table[new_index] = []
+                table[new_index].append(entry)
+            old_table[old_index] = EMPTY_BUCKET
+        self.rehash_index = stop
+        # Resize finished once every old bucket has been moved
+        if stop == len(old_table):
+            self.old_table = None
+
+    # Method to return every key-value pair in the hash table, in bucket order
+    def items(self):
         all_items = []
-        # Flatten the buckets
+        # Flatten the buckets, including any that haven't been moved by a resize yet
+        if self.old_table is not None:
+            for bucket in self.old_table:
+                all_items.extend(bucket)
         for bucket in self.table:
-            all_items.extend(bucket)  
-        # Sort by key (e.g., alphabetical order)
-        for key, value in sorted(all_items, key=lambda x: x[0]):
-            print(f"{key}: {value}")
+            all_items.extend(bucket)
+        return all_items
+
+    # Method to report bucket occupancy, chain lengths and hashing cost
+    def stats(self):
+        # Buckets an in-progress resize hasn't moved yet still hold chains of their own
+        buckets = self.table + (self.old_table[self.rehash_index:] if self.old_table is not None else [])
+        lengths = [len(bucket) for bucket in buckets]
+        occupied = sum(1 for length in lengths if length) / len(lengths)
+        bucket_of, num_buckets = self.bucket_of, self.num_buckets
+        keys = [key for key, _ in self.items()]
+        start_time = time.perf_counter()
+        for key in keys:
+            bucket_of(key, num_buckets)
+        hash_time = time.perf_counter() - start_time
+        return self._stats_from(lengths, occupied, hash_time, "chain")
 
     # Function to print the hash tables individually so they can be viewed in the terminal
     def display_table_10(hash_table):
@@ -60,6 +280,423 @@ class HashTable:
     def display_table_1000(hash_table):
         print("Displaying 1000-bucket hash table:")
         print_table(hash_table)
+
+
+# Marker stored in the hash array for a slot that holds no entry (hash() never returns -1)
+EMPTY_SLOT = -1
+
+# Hash Table engine using open addressing with Robin Hood displacement
+class RobinHoodHashTable(BaseHashTable):
+    # Initialize the table with room for at least num_buckets entries
+    # expected_entries and false_positive_rate size an optional counting Bloom filter, as for HashTable
+    def __init__(self, num_buckets, max_load_factor=0.85, ordered=False, expected_entries=None,
+                 false_positive_rate=0.01):
+        self.max_load_factor = max_load_factor
+        self.size = 0
+        self.resize_count = 0
+        self.index = SortedKeyIndex() if ordered else None
+        self.bloom = CountingBloomFilter(expected_entries, false_positive_rate) if expected_entries else None
+        self._allocate(self._capacity_for(num_buckets))
+
+    # Round the requested number of entries up to a power of two that stays under the load limit
+    def _capacity_for(self, num_entries):
+        capacity = 8
+        while capacity * self.max_load_factor < num_entries:
+            capacity *= 2
+        return capacity
+
+    # Create empty parallel arrays for the keys, cached hashes and values
+    def _allocate(self, capacity):
+        self.num_buckets = capacity
+        self.mask = capacity - 1
+        self.hashes = array('q', [EMPTY_SLOT]) * capacity
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+
+    # Hash function: the cached hash is kept per slot so it is only computed once per key
+    def hash_function(self, key):
+        return hash(key)
+
+    # Method to insert a key-value pair into the hash table
+    def insert(self, key, value):
+        key_hash = self.hash_function(key)
+        hashes, keys, values, mask = self.hashes, self.keys, self.values, self.mask
+        index = key_hash & mask
+        distance = 0
+        while True:
+            slot_hash = hashes[index]
+            # Empty slot: the new entry lands here
+            if slot_hash == EMPTY_SLOT:
+                # Only a new key needs room, so the load check waits until the probe rules out an update
+                if self.size + 1 > self.num_buckets * self.max_load_factor:
+                    self._resize(self.num_buckets * 2)
+                    return self.insert(key, value)
+                hashes[index] = key_hash
+                keys[index] = key
+                values[index] = value
+                self.size += 1
+                if self.index is not None:
+                    self.index.add(key)
+                if self.bloom is not None:
+                    self.bloom.add(key)
+                return
+            # Same key: update the value in place
+            if slot_hash == key_hash and keys[index] == key:
+                values[index] = value
+                return
+            # Robin Hood: if the resident is closer to its home slot than we are, take its place
+            slot_distance = (index - slot_hash) & mask
+            if slot_distance < distance:
+                if self.size + 1 > self.num_buckets * self.max_load_factor:
+                    self._resize(self.num_buckets * 2)
+                    return self.insert(key, value)
+                if self.index is not None:
+                    self.index.add(key)
+                if self.bloom is not None:
+                    self.bloom.add(key)
+                hashes[index], key_hash = key_hash, slot_hash
+                keys[index], key = key, keys[index]
+                values[index], value = value, values[index]
+                distance = slot_distance
+                # The displaced entry can't match any key further along, so skip the equality checks
+                self._place(key_hash, key, value, (index + 1) & mask, distance + 1)
+                return
+            index = (index + 1) & mask
+            distance += 1
+
+    # Continue placing a displaced entry that is known not to be in the table yet
+    def _place(self, key_hash, key, value, index, distance):
+        hashes, keys, values, mask = self.hashes, self.keys, self.values, self.mask
+        while True:
+            slot_hash = hashes[index]
+            if slot_hash == EMPTY_SLOT:
+                hashes[index] = key_hash
+                keys[index] = key
+                values[index] = value
+                self.size += 1
+                return
+            slot_distance = (index - slot_hash) & mask
+            if slot_distance < distance:
+                hashes[index], key_hash = key_hash, slot_hash
+                keys[index], key = key, keys[index]
+                values[index], value = value, values[index]
+                distance = slot_distance
+            index = (index + 1) & mask
+            distance += 1
+
+    # Method to retrieve a value based on a key
+    def retrieve(self, key):
+        if self.bloom is not None and key not in self.bloom:
+            return None
+        key_hash = self.hash_function(key)
+        hashes, keys, mask = self.hashes, self.keys, self.mask
+        index = key_hash & mask
+        distance = 0
+        while True:
+            slot_hash = hashes[index]
+            # An empty slot, or a resident closer to home than we are, means the key is absent
+            if slot_hash == EMPTY_SLOT or ((index - slot_hash) & mask) < distance:
+                return None
+            if slot_hash == key_hash and keys[index] == key:
+                return self.values[index]
+            index = (index + 1) & mask
+            distance += 1
+
+    # Method to remove a key from the hash table, returning its value (None if it wasn't there)
+    def delete(self, key):
+        key_hash = self.hash_function(key)
+        hashes, keys, values, mask = self.hashes, self.keys, self.values, self.mask
+        index = key_hash & mask
+        distance = 0
+        while True:
+            slot_hash = hashes[index]
+            if slot_hash == EMPTY_SLOT or ((index - slot_hash) & mask) < distance:
+                return None
+            if slot_hash == key_hash and keys[index] == key:
+                break
+            index = (index + 1) & mask
+            distance += 1
+        value = values[index]
+        # Backward shift: pull each following entry one slot closer to home until one is already home
+        next_index = (index + 1) & mask
+        while hashes[next_index] != EMPTY_SLOT and ((next_index - hashes[next_index]) & mask) != 0:
+            hashes[index] = hashes[next_index]
+            keys[index] = keys[next_index]
+            values[index] = values[next_index]
+            index, next_index = next_index, (next_index + 1) & mask
+        hashes[index] = EMPTY_SLOT
+        keys[index] = None
+        values[index] = None
+        self.size -= 1
+        if self.index is not None:
+            self.index.remove(key)
+        if self.bloom is not None:
+            self.bloom.remove(key)
+        return value
+
+    # Method to grow the arrays up front so num_entries entries fit under the load limit
+    def reserve(self, num_entries):
+        capacity = self._capacity_for(num_entries)
+        if capacity > self.num_buckets:
+            self._resize(capacity)
+
+    # Rebuild the arrays at a new capacity, reusing the cached hashes
+    def _resize(self, capacity):
+        old_hashes, old_keys, old_values = self.hashes, self.keys, self.values
+        self._allocate(capacity)
+        self.size = 0
+        self.resize_count += 1
+        for index, key_hash in enumerate(old_hashes):
+            if key_hash != EMPTY_SLOT:
+                self._place(key_hash, old_keys[index], old_values[index], key_hash & self.mask, 0)
+
+    # Method to return every key-value pair in the hash table, in slot order
+    def items(self):
+        keys, values = self.keys, self.values
+        return [(keys[index], values[index])
+                for index, key_hash in enumerate(self.hashes) if key_hash != EMPTY_SLOT]
+
+    # Method to report slot occupancy, probe lengths (1 = found in its home slot) and hashing cost
+    def stats(self):
+        mask = self.mask
+        lengths = [((index - key_hash) & mask) + 1
+                   for index, key_hash in enumerate(self.hashes) if key_hash != EMPTY_SLOT]
+        keys = [self.keys[index] for index, key_hash in enumerate(self.hashes) if key_hash != EMPTY_SLOT]
+        hash_function = self.hash_function
+        start_time = time.perf_counter()
+        for key in keys:
+            hash_function(key)
+        hash_time = time.perf_counter() - start_time
+        return self._stats_from(lengths, self.size / self.num_buckets, hash_time, "probe")
+
+
+# Slots in each cuckoo bucket, entries the stash can hold, and displacements tried before giving up
+CUCKOO_SLOTS = 4
+CUCKOO_STASH_SIZE = 4
+CUCKOO_MAX_KICKS = 100
+# Rehashes in a row that may fail before the stash is allowed to grow past CUCKOO_STASH_SIZE instead;
+# keys that share one hash() value always land in the same two buckets, so no rehash can separate them
+CUCKOO_MAX_FAILED_REHASHES = 4
+# Odd 64-bit multipliers for the two cuckoo hash functions (golden ratio and an xxHash prime)
+CUCKOO_MULTIPLIER_1 = 0x9E3779B97F4A7C15
+CUCKOO_MULTIPLIER_2 = 0xC2B2AE3D27D4EB4F
+MASK_64 = (1 << 64) - 1
+
+# Hash Table engine using bucketized cuckoo hashing
+# Every key lives in one of two candidate buckets of CUCKOO_SLOTS slots, or in a small stash,
+# so retrieve looks at no more than two buckets and the stash however the keys collide
+class CuckooHashTable(BaseHashTable):
+    # Initialize the table with room for at least num_buckets entries
+    # ordered, expected_entries and false_positive_rate work as for HashTable
+    def __init__(self, num_buckets, max_load_factor=0.9, ordered=False, expected_entries=None,
+                 false_positive_rate=0.01, seed=0):
+        self.max_load_factor = max_load_factor
+        self.size = 0
+        self.resize_count = 0
+        self.rehash_count = 0
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rehashing = False
+        # Rehashes since the stash last fitted, for giving up on a cycle no rehash will break
+        self.failed_rehashes = 0
+        self.index = SortedKeyIndex() if ordered else None
+        self.bloom = CountingBloomFilter(expected_entries, false_positive_rate) if expected_entries else None
+        # Entries that couldn't be placed in either bucket, as (hash, key, value)
+        self.stash = []
+        self._allocate(self._bucket_count_for(num_buckets))
+
+    # Round up to a power-of-two number of buckets whose slots fit num_entries under the load limit
+    def _bucket_count_for(self, num_entries):
+        bucket_count = 2
+        while bucket_count * CUCKOO_SLOTS * self.max_load_factor < num_entries:
+            bucket_count *= 2
+        return bucket_count
+
+    # Create empty parallel arrays for the keys, cached hashes and values
+    def _allocate(self, bucket_count):
+        self.bucket_count = bucket_count
+        self.num_buckets = bucket_count * CUCKOO_SLOTS
+        # The bucket is taken from the top bits of the 64-bit product
+        self.shift = 64 - (bucket_count.bit_length() - 1)
+        self.hashes = array('q', [EMPTY_SLOT]) * self.num_buckets
+        self.keys = [None] * self.num_buckets
+        self.values = [None] * self.num_buckets
+
+    # Hash function: the cached hash is kept per slot so a displaced entry is never rehashed
+    def hash_function(self, key):
+        return hash(key)
+
+    # First slot of each of the key's two candidate buckets
+    def _bucket_starts(self, key_hash):
+        mixed = key_hash ^ self.seed
+        first = (((mixed * CUCKOO_MULTIPLIER_1) & MASK_64) >> self.shift) * CUCKOO_SLOTS
+        second = (((mixed * CUCKOO_MULTIPLIER_2) & MASK_64) >> self.shift) * CUCKOO_SLOTS
+        return first, second
+
+    # Find the slot holding a key in its two buckets, or -1
+    def _find(self, key_hash, key):
+        hashes, keys = self.hashes, self.keys
+        for start in self._bucket_starts(key_hash):
+            for slot in range(start, start + CUCKOO_SLOTS):
+                if hashes[slot] == key_hash and keys[slot] == key:
+                    return slot
+        return -1
+
+    # Method to retrieve a value based on a key
+    def retrieve(self, key):
+        if self.bloom is not None and key not in self.bloom:
+            return None
+        key_hash = self.hash_function(key)
+        hashes, keys = self.hashes, self.keys
+        # At most two buckets to look at: the first, then the second
+        mixed = key_hash ^ self.seed
+        start = (((mixed * CUCKOO_MULTIPLIER_1) & MASK_64) >> self.shift) * CUCKOO_SLOTS
+        for slot in range(start, start + CUCKOO_SLOTS):
+            if hashes[slot] == key_hash and keys[slot] == key:
+                return self.values[slot]
+        start = (((mixed * CUCKOO_MULTIPLIER_2) & MASK_64) >> self.shift) * CUCKOO_SLOTS
+        for slot in range(start, start + CUCKOO_SLOTS):
+            if hashes[slot] == key_hash and keys[slot] == key:
+                return self.values[slot]
+        for stash_hash, stash_key, stash_value in self.stash:
+            if stash_hash == key_hash and stash_key == key:
+                return stash_value
+        return None
+
+    # Method to insert a key-value pair into the hash table
+    def insert(self, key, value):
+        key_hash = self.hash_function(key)
+        slot = self._find(key_hash, key)
+        if slot >= 0:
+            self.values[slot] = value
+            return
+        for position, (stash_hash, stash_key, _) in enumerate(self.stash):
+            if stash_hash == key_hash and stash_key == key:
+                self.stash[position] = (key_hash, key, value)
+                return
+        if self.size + 1 > self.num_buckets * self.max_load_factor:
+            self._rehash(self.bucket_count * 2)
+        self.size += 1
+        if self.index is not None:
+            self.index.add(key)
+        if self.bloom is not None:
+            self.bloom.add(key)
+        self._place(key_hash, key, value)
+
+    # Put a new entry in a free slot of either bucket, kicking other entries to their
+    # other bucket if both are full; stash the entry left over if that goes on too long
+    def _place(self, key_hash, key, value):
+        hashes, keys, values = self.hashes, self.keys, self.values
+        for _ in range(CUCKOO_MAX_KICKS):
+            first, second = self._bucket_starts(key_hash)
+            for start in (first, second):
+                for slot in range(start, start + CUCKOO_SLOTS):
+                    if hashes[slot] == EMPTY_SLOT:
+                        hashes[slot] = key_hash
+                        keys[slot] = key
+                        values[slot] = value
+                        return
+            # Both buckets full: swap with a random resident, which then moves to its other bucket
+            slot = self.rng.choice((first, second)) + self.rng.randrange(CUCKOO_SLOTS)
+            hashes[slot], key_hash = key_hash, hashes[slot]
+            keys[slot], key = key, keys[slot]
+            values[slot], value = value, values[slot]
+        if len(self.stash) < CUCKOO_STASH_SIZE:
+            self.stash.append((key_hash, key, value))
+            return
+        # The stash is full too, so we're stuck in a cycle: rehash with new hash functions,
+        # growing as well if the table is more than half full or a rehash just failed the same way
+        self.stash.append((key_hash, key, value))
+        if self.failed_rehashes >= CUCKOO_MAX_FAILED_REHASHES:
+            # Rehashing keeps failing (e.g. many keys with equal hashes): let the stash grow, so these
+            # keys cost a stash scan rather than the table doubling until memory runs out
+            return
+        self.failed_rehashes += 1
+        grow = self.size > self.num_buckets // 2 or self.rehashing
+        self._rehash(self.bucket_count * 2 if grow else self.bucket_count)
+
+    # Rebuild the arrays (at a new size, or the same size with a new seed), reusing the cached hashes
+    def _rehash(self, bucket_count):
+        entries = [(key_hash, self.keys[slot], self.values[slot])
+                   for slot, key_hash in enumerate(self.hashes) if key_hash != EMPTY_SLOT]
+        entries.extend(self.stash)
+        if bucket_count == self.bucket_count:
+            self.rehash_count += 1
+        else:
+            self.resize_count += 1
+        self.seed = self.rng.getrandbits(64)
+        self.stash = []
+        self._allocate(bucket_count)
+        # A cycle while placing these entries means this seed failed too, so the next rehash grows
+        was_rehashing, self.rehashing = self.rehashing, True
+        for entry in entries:
+            self._place(*entry)
+        self.rehashing = was_rehashing
+        # Everything fitted back under the stash limit, so rehashing works again
+        if not was_rehashing and len(self.stash) <= CUCKOO_STASH_SIZE:
+            self.failed_rehashes = 0
+
+    # Method to remove a key from the hash table, returning its value (None if it wasn't there)
+    def delete(self, key):
+        key_hash = self.hash_function(key)
+        slot = self._find(key_hash, key)
+        if slot >= 0:
+            value = self.values[slot]
+            self.hashes[slot] = EMPTY_SLOT
+            self.keys[slot] = None
+            self.values[slot] = None
+        else:
+            for position, (stash_hash, stash_key, stash_value) in enumerate(self.stash):
+                if stash_hash == key_hash and stash_key == key:
+                    del self.stash[position]
+                    value = stash_value
+                    break
+            else:
+                return None
+        self.size -= 1
+        if self.index is not None:
+            self.index.remove(key)
+        if self.bloom is not None:
+            self.bloom.remove(key)
+        return value
+
+    # Method to grow the arrays up front so num_entries entries fit under the load limit
+    def reserve(self, num_entries):
+        bucket_count = self._bucket_count_for(num_entries)
+        if bucket_count > self.bucket_count:
+            self._rehash(bucket_count)
+
+    # Method to return every key-value pair in the hash table, in slot order, then the stash
+    def items(self):
+        keys, values = self.keys, self.values
+        all_items = [(keys[slot], values[slot])
+                     for slot, key_hash in enumerate(self.hashes) if key_hash != EMPTY_SLOT]
+        all_items.extend((key, value) for _, key, value in self.stash)
+        return all_items
+
+    # Method to report slot occupancy, probe lengths (1 = first bucket, 2 = second, 3 = stash) and hashing cost
+    def stats(self):
+        lengths = []
+        for slot, key_hash in enumerate(self.hashes):
+            if key_hash != EMPTY_SLOT:
+                first, _ = self._bucket_starts(key_hash)
+                lengths.append(1 if first <= slot < first + CUCKOO_SLOTS else 2)
+        lengths.extend(3 for _ in self.stash)
+        keys = [key for key, _ in self.items()]
+        hash_function = self.hash_function
+        start_time = time.perf_counter()
+        for key in keys:
+            self._bucket_starts(hash_function(key))
+        hash_time = time.perf_counter() - start_time
+        return self._stats_from(lengths, self.size / self.num_buckets, hash_time, "probe")
+
+
+# Hash table engines that the timing runs can choose between
+ENGINES = {
+    "chaining": HashTable,
+    "robinhood": RobinHoodHashTable,
+    "cuckoo": CuckooHashTable,
+}
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Function to load dataset
@@ -72,6 +709,127 @@ def load_dataset(file_name):
         return []
 
 
+# Key used for every registration stored in the hash tables
+def registration_key(entry):
+    return f"{entry['name']} ({entry['state']})"
+
+
+# Generator pairing each registration with its key, so bulk inserts never build a list
+def registration_items(entries):
+    for entry in entries:
+        yield registration_key(entry), entry
+
+
+# Function to check whether the array element starting at buffer[position] is followed by the array's
+# next ',' or ']' inside the buffer, i.e. the whole element has been read
+# Strings and nesting are tracked so commas and brackets inside the element don't count
+def _element_complete(buffer, position):
+    depth = 0
+    in_string = escaped = False
+    for i in range(position, len(buffer)):
+        char = buffer[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            if depth == 0:
+                return True
+            depth -= 1
+        elif char == ',' and depth == 0:
+            return True
+    return False
+
+
+# Generator that reads registrations one record at a time from a JSON array or JSON-lines file
+# Only one chunk of the file is held in memory at a time, so exports larger than RAM still load
+def stream_dataset(file_name, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    with open(file_name, 'r') as file:
+        buffer = file.read(chunk_size)
+        position = len(buffer) - len(buffer.lstrip())
+        # JSON-lines file: every line is one complete record
+        if not buffer.startswith('[', position):
+            file.seek(0)
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        position += 1
+        end_of_file = False
+        while True:
+            # Skip the whitespace and commas between records, reading more of the file as needed
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                if end_of_file:
+                    raise ValueError(f"File '{file_name}' ended before the closing ']'")
+                buffer, position = file.read(chunk_size), 0
+                end_of_file = not buffer
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # A record followed by the array's next ',' or ']' is all there and just malformed;
+                # otherwise it runs past the end of the buffer, so read the next chunk and try again
+                if end_of_file or _element_complete(buffer, position):
+                    raise
+                more = file.read(chunk_size)
+                end_of_file = not more
+                buffer, position = buffer[position:] + more, 0
+                continue
+            yield record
+            position = end
+
+
+# Estimate how many records a registration file holds from the records in a sample at its start
+# Only complete top-level records are counted, so nested objects and braces inside strings don't
+# inflate the estimate; the count is scaled by the share of the file those records take up
+def estimate_record_count(file_name, sample_size=1 << 16):
+    with open(file_name, 'r') as file:
+        sample = file.read(sample_size)
+    position = len(sample) - len(sample.lstrip())
+    records = 0
+    if sample.startswith('[', position):
+        # JSON array: decode records one after another until one runs past the end of the sample
+        decoder = json.JSONDecoder()
+        position += 1
+        end = position
+        while True:
+            while position < len(sample) and sample[position] in ' \t\r\n,':
+                position += 1
+            if position == len(sample) or sample[position] == ']':
+                break
+            try:
+                _, position = decoder.raw_decode(sample, position)
+            except json.JSONDecodeError:
+                break
+            records += 1
+            end = position
+    else:
+        # JSON-lines file: one record per non-blank complete line
+        end = sample.rfind('\n') + 1 if len(sample) == sample_size else len(sample)
+        records = sum(1 for line in sample[:end].splitlines() if line.strip())
+    if records == 0:
+        return 0
+    return records * os.path.getsize(file_name) // len(sample[:end].encode())
+
+
+# Stream a registration file straight into a hash table, returning the number of records read
+def load_dataset_into(hash_table, file_name):
+    return hash_table.insert_many(registration_items(stream_dataset(file_name)),
+                                  estimate_record_count(file_name))
+
 # Measure runtime of a function with flexible arguments
 def measure_runtime(func, *args, **kwargs):
     start_time = time.perf_counter()
@@ -80,19 +838,18 @@ def measure_runtime(func, *args, **kwargs):
     return result, end_time - start_time
 
 
+# Describe the size of a hash table so reports show when a resize happened
+def describe_table(hash_table):
+    return (f"capacity {hash_table.capacity()}, load factor {hash_table.load_factor():.2f}, "
+            f"{hash_table.resize_count} resize(s)")
+
+
 # Measure runtime of sorting entries
 def measure_sort_runtime(hash_table):
     # Measure the time taken to sort the entries in the hash table
     def sort_entries():
-        # Empty list to store sorted entries
-        all_items = []
-        # Iterate through the hash table buckets
-        for bucket in hash_table.table:
-            # Append each entry in the bucket to the list
-            all_items.extend(bucket)
-        # Sort the list of entries based on the key
-        sorted_items = sorted(all_items, key=lambda x: x[0])
-        return sorted_items
+        # Entries come back in key order, straight from the sorted key index if the table keeps one
+        return hash_table.sorted_items()
 
     # Store the time taken to sort the entries for return
     _, sort_time = measure_runtime(sort_entries)
@@ -100,76 +857,18 @@ def measure_sort_runtime(hash_table):
     return sort_time
 
 
-# Function to save performance data to a CSV file
-def save_performance_data(file_name, performance_data):
-    # Check if the file exists
-    file_exists = False
-    try:
-        file_exists = open(file_name).close() is None
-    except FileNotFoundError:
-        pass
-
-    # Format the data to avoid scientific notation
-    formatted_data = [(f"{insert_time:.6f}", f"{sort_time:.6f}", data_set_size)
-                      for insert_time, sort_time, data_set_size in performance_data]
-
-    # Save the performance data to a CSV file
-    with open(file_name, 'a', newline='') as file:
-        writer = csv.writer(file)
-        # Write headers if the file doesn't exist
-        if not file_exists:
-            writer.writerow(['Insert Time (s)', 'Sort Time (s)', 'Data Set Size'])
-        writer.writerows(formatted_data)
-    print(f"Performance data saved to {file_name}")
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 # Main execution
+# Runs the benchmark harness (see benchmark.py for the options), e.g. "python main.py --engines robinhood"
 if __name__ == "__main__":
-    # Load datasets
-    dataset_10 = load_dataset("Python\Hash Map Project\\10_entries_realistic.json")
-    dataset_100 = load_dataset("Python\Hash Map Project\\100_entries_realistic.json")
-    dataset_1000 = load_dataset("Python\Hash Map Project\\1000_entries_realistic.json")
-
-    # Create and populate hash tables
-    hash_table_10 = HashTable(10)
-    hash_table_100 = HashTable(100)
-    hash_table_1000 = HashTable(1000)
-
-    # Measure insertion times and display
-    _, insert_time_10 = measure_runtime(
-        lambda: [hash_table_10.insert(
-            f"{entry['name']} ({entry['state']})", entry) for entry in dataset_10]
-    )
-    print(f"Insert time for 10 buckets: {insert_time_10:.6f} seconds")
-
-    _, insert_time_100 = measure_runtime(
-        lambda: [hash_table_100.insert(
-            f"{entry['name']} ({entry['state']})", entry) for entry in dataset_100]
-    )
-    print(f"Insert time for 100 buckets: {insert_time_100:.6f} seconds")
-
-    _, insert_time_1000 = measure_runtime(
-        lambda: [hash_table_1000.insert(
-            f"{entry['name']} ({entry['state']})", entry) for entry in dataset_1000]
-    )
-    print(f"Insert time for 1000 buckets: {insert_time_1000:.6f} seconds")
-
-    # Measure sorting time
-    sort_time_10 = measure_sort_runtime(hash_table_10)
-    sort_time_100 = measure_sort_runtime(hash_table_100)
-    sort_time_1000 = measure_sort_runtime(hash_table_1000)
-
-    # Uncomment these lines to display tables separately
-    # hash_table_10.print_table()
-    hash_table_100.print_table()
-    # hash_table_1000.print_table()
+    import benchmark
 
-    # Collect performance data
-    performance_data = [
-        (insert_time_10, sort_time_10, len(dataset_10)),
-        (insert_time_100, sort_time_100, len(dataset_100)),
-        (insert_time_1000, sort_time_1000, len(dataset_1000))
-    ]
+    options = benchmark.parse_arguments()
+    # Display the 100-entry table, as the original demo did
+    hash_table_100 = ENGINES[options.engines[0]](100, ordered=options.ordered)
+    hash_table_100.insert_many(registration_items(benchmark.bundled_dataset(100)))
+    hash_table_100.print_table()
+    print(describe_table(hash_table_100))
 
-    # Save performance data to file
-    save_performance_data("performance_data.txt", performance_data)
+    benchmark.main()
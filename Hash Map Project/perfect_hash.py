@@ -0,0 +1,241 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Read-only hash table built on a minimal perfect hash once registration has closed
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Built with CHD (compress, hash, displace): keys are grouped into small buckets, and each bucket
+# gets a displacement that sends all of its keys to free slots. n keys fill exactly n slots, so a
+# lookup hashes the key once, reads one displacement and compares one key - there are no chains.
+# Keys are kept as one byte blob with an offset array and values as one list in slot order, instead
+# of a list per bucket and a pair per entry.
+
+import json, struct, sys
+from array import array
+from hashlib import blake2b
+
+FROZEN_MAGIC = b"HMPHF001"
+# File header: magic, number of keys, number of buckets, hash seed, length of the values JSON
+FROZEN_HEADER = struct.Struct("<8sQQQQ")
+# Average number of keys per CHD bucket; larger builds slower but stores fewer displacements
+KEYS_PER_BUCKET = 3
+# Hash seeds to try before giving up; one almost always works, so hitting this means something is wrong
+MAX_SEEDS = 64
+# Displacements tried per bucket, as a multiple of the key count, before the seed is dropped for the next
+MAX_DISPLACEMENT_ROUNDS = 16
+MASK_32 = 0xFFFFFFFF
+
+
+# Stable hash of a key split into the bucket number and the two values that place it in a slot
+# Stable between runs (unlike hash()), so a saved table can be loaded by another process
+def chd_hashes(key_bytes, salt):
+    value = int.from_bytes(blake2b(key_bytes, digest_size=16, salt=salt).digest(), 'little')
+    return value & MASK_32, (value >> 32) & MASK_32, value >> 64
+
+
+# Read-only table keyed by a minimal perfect hash, with the same retrieve API as HashTable
+class FrozenHashTable:
+    def __init__(self, seed, displacements, key_offsets, key_blob, values):
+        self.seed = seed
+        self.salt = seed.to_bytes(16, 'little')
+        self.displacements = displacements
+        self.key_offsets = key_offsets
+        self.key_blob = key_blob
+        self.values = values
+        self.size = len(values)
+        self.num_buckets = len(displacements)
+
+    # Build a frozen table from (key, value) pairs; values must be JSON-serializable to save()
+    # A repeated key keeps its last value, as insert would
+    @classmethod
+    def build(cls, items, keys_per_bucket=KEYS_PER_BUCKET, max_seeds=MAX_SEEDS):
+        entries = list({key.encode('utf-8'): value for key, value in items}.items())
+        size = len(entries)
+        num_buckets = max(1, -(-size // keys_per_bucket))
+        for seed in range(max_seeds):
+            displacements = cls._displace(entries, size, num_buckets, seed)
+            if displacements is not None:
+                break
+            # Give up on this hash function and try another one (rare)
+        else:
+            raise ValueError(f"No perfect hash found for {size} keys after {max_seeds} hash seeds")
+
+        # Lay the keys and values out in slot order
+        slot_of = [0] * size
+        for position, (key_bytes, _) in enumerate(entries):
+            bucket, f1, f2 = chd_hashes(key_bytes, seed.to_bytes(16, 'little'))
+            slot_of[position] = cls._slot(displacements[bucket % num_buckets], f1, f2, size)
+        ordered = [None] * size
+        for position, slot in enumerate(slot_of):
+            ordered[slot] = entries[position]
+        key_offsets = array('Q', [0])
+        for key_bytes, _ in ordered:
+            key_offsets.append(key_offsets[-1] + len(key_bytes))
+        key_blob = b"".join(key_bytes for key_bytes, _ in ordered)
+        return cls(seed, displacements, key_offsets, key_blob, [value for _, value in ordered])
+
+    # Slot for a key with hash values f1, f2 under displacement d (d encodes the pair d0, d1)
+    @staticmethod
+    def _slot(displacement, f1, f2, size):
+        return (f1 + (displacement // size) * f2 + displacement % size) % size
+
+    # Find a displacement for every bucket, biggest buckets first; None if the seed doesn't work
+    @classmethod
+    def _displace(cls, entries, size, num_buckets, seed):
+        buckets = [[] for _ in range(num_buckets)]
+        salt = seed.to_bytes(16, 'little')
+        for key_bytes, _ in entries:
+            bucket, f1, f2 = chd_hashes(key_bytes, salt)
+            buckets[bucket % num_buckets].append((f1, f2))
+        displacements = array('Q', [0]) * num_buckets
+        taken = bytearray(size)
+        free_slots = None
+        for bucket in sorted(range(num_buckets), key=lambda b: len(buckets[b]), reverse=True):
+            keys = buckets[bucket]
+            if not keys:
+                break
+            if len(keys) == 1:
+                # A lone key can go straight into any free slot: pick d0 = 0 and solve for d1
+                if free_slots is None:
+                    free_slots = [slot for slot in range(size) if not taken[slot]]
+                f1, _ = keys[0]
+                slot = free_slots.pop()
+                taken[slot] = 1
+                displacements[bucket] = (slot - f1) % size
+                continue
+            # Step d0 fastest: keys that collide at one d0 usually don't at the next, while
+            # stepping d1 just shifts every key together and keeps the collision
+            # A bucket that fits nowhere in a few rounds of d0 is cheaper to retry under another seed
+            for attempt in range(min(size, MAX_DISPLACEMENT_ROUNDS) * size):
+                d0, d1 = attempt % size, attempt // size
+                slots = {(f1 + d0 * f2 + d1) % size for f1, f2 in keys}
+                if len(slots) == len(keys) and not any(taken[slot] for slot in slots):
+                    for slot in slots:
+                        taken[slot] = 1
+                    displacements[bucket] = d0 * size + d1
+                    break
+            else:
+                # No free slots for this bucket (or two of its keys have identical hash values)
+                return None
+        return displacements
+
+    # Method to retrieve a value based on a key
+    def retrieve(self, key):
+        if self.size == 0:
+            return None
+        key_bytes = key.encode('utf-8')
+        bucket, f1, f2 = chd_hashes(key_bytes, self.salt)
+        slot = self._slot(self.displacements[bucket % self.num_buckets], f1, f2, self.size)
+        # Every key maps to some slot, so check it really is this key before returning the value
+        if self.key_blob[self.key_offsets[slot]:self.key_offsets[slot + 1]] != key_bytes:
+            return None
+        return self.values[slot]
+
+    # A frozen table can't change
+    def insert(self, key, value):
+        raise TypeError("FrozenHashTable is read-only; insert into a HashTable and freeze() it again")
+
+    # Method to return every key-value pair in the hash table, in slot order
+    def items(self):
+        key_offsets = self.key_offsets
+        return [(self.key_blob[key_offsets[slot]:key_offsets[slot + 1]].decode('utf-8'), self.values[slot])
+                for slot in range(self.size)]
+
+    # Method to return every key-value pair sorted by key
+    def sorted_items(self):
+        return sorted(self.items(), key=lambda x: x[0])
+
+    # Method to display the hash table to the console
+    def print_table(self):
+        for key, value in self.sorted_items():
+            print(f"{key}: {value}")
+
+    # Method to report how many slots the table has (always one per key)
+    def capacity(self):
+        return self.size
+
+    def load_factor(self):
+        return 1.0 if self.size else 0.0
+
+    # Method to write the table to a file that load() can read back without rebuilding
+    def save(self, path):
+        value_blob = json.dumps(self.values).encode('utf-8')
+        arrays = [self.displacements, self.key_offsets]
+        # The file is always little-endian
+        if sys.byteorder == 'big':
+            arrays = [array('Q', values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        with open(path, 'wb') as file:
+            file.write(FROZEN_HEADER.pack(FROZEN_MAGIC, self.size, self.num_buckets, self.seed, len(value_blob)))
+            for values in arrays:
+                values.tofile(file)
+            file.write(self.key_blob)
+            file.write(value_blob)
+
+    # Load a table written by save(); the arrays are copied straight in and nothing is rehashed
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, size, num_buckets, seed, value_length = FROZEN_HEADER.unpack_from(data, 0)
+        if magic != FROZEN_MAGIC:
+            raise ValueError(f"'{path}' is not a frozen hash table file")
+        position = FROZEN_HEADER.size
+        arrays = []
+        for length in (num_buckets, size + 1):
+            values = array('Q')
+            values.frombytes(data[position:position + length * values.itemsize])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            position += length * values.itemsize
+            arrays.append(values)
+        displacements, key_offsets = arrays
+        key_blob = data[position:position + key_offsets[-1]]
+        position += key_offsets[-1]
+        values = json.loads(data[position:position + value_length])
+        return cls(seed, displacements, key_offsets, key_blob, values)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Main execution
+if __name__ == "__main__":
+    import gc, os, tempfile, tracemalloc
+    # Imported here because main.py imports this module for freeze()
+    from main import HashTable, measure_runtime, registration_key, registration_items
+    from benchmark import bundled_dataset
+
+    registrations = bundled_dataset(1000)
+    keys = [registration_key(entry) for entry in registrations]
+    items = list(registration_items(registrations))
+
+    # Bytes still allocated once build() has returned, not counting the records themselves
+    def traced_bytes(build):
+        gc.collect()
+        tracemalloc.start()
+        result = build()
+        # Also empties the free lists, which tracemalloc counts as in use
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+
+    def build_table():
+        table = HashTable(1000)
+        table.insert_many(items)
+        return table
+
+    table, table_bytes = traced_bytes(build_table)
+    (frozen, build_time), frozen_bytes = traced_bytes(lambda: measure_runtime(table.freeze))
+    print(f"Froze {frozen.size} keys into {frozen.num_buckets} displacements in {build_time:.6f} seconds")
+    print(f"Memory besides the records: HashTable ~{table_bytes} bytes, FrozenHashTable ~{frozen_bytes} bytes")
+
+    _, table_time = measure_runtime(lambda: [table.retrieve(key) for key in keys])
+    _, frozen_time = measure_runtime(lambda: [frozen.retrieve(key) for key in keys])
+    print(f"Retrieve every key: HashTable {table_time:.6f} seconds, FrozenHashTable {frozen_time:.6f} seconds")
+
+    path = os.path.join(tempfile.gettempdir(), "registrations.phf")
+    frozen.save(path)
+    loaded, load_time = measure_runtime(FrozenHashTable.load, path)
+    assert all(loaded.retrieve(key) == table.retrieve(key) for key in keys)
+    assert loaded.retrieve("Nobody (Nowhere)") is None
+    print(f"Saved to {path} ({os.path.getsize(path)} bytes), loaded back in {load_time:.6f} seconds")
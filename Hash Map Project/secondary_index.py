@@ -0,0 +1,155 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Secondary indexes over the registration records stored in a hash table
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import sys
+from main import BaseHashTable, HashTable, measure_runtime, registration_items
+from benchmark import bundled_dataset
+
+
+# Index from one record field (e.g. 'state') to the set of keys whose record has each value
+class SecondaryIndex:
+    def __init__(self, field):
+        self.field = field
+        self.postings = {}
+
+    # Method to record that key's record has been stored
+    def add(self, key, record):
+        if self.field in record:
+            self.postings.setdefault(record[self.field], set()).add(key)
+
+    # Method to forget key's old record, dropping the posting list if it becomes empty
+    def remove(self, key, record):
+        if self.field not in record:
+            return
+        keys = self.postings.get(record[self.field])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.postings[record[self.field]]
+
+    # Method to return the keys whose record has the given value (an empty set if there are none)
+    def lookup(self, value):
+        return self.postings.get(value, set())
+
+    # Method to return every distinct value of the field with its number of records
+    def counts(self):
+        return {value: len(keys) for value, keys in self.postings.items()}
+
+
+# Hash table wrapper that keeps secondary indexes on record fields in sync with the table
+# Works with any of the engines: the table does the storage, the wrapper only maintains the indexes
+# insert_many, print_table and the sorted reads come from BaseHashTable and go through insert below
+class IndexedHashTable(BaseHashTable):
+    def __init__(self, table=None, indexes=()):
+        self.table = table if table is not None else HashTable(10)
+        self.indexes = {}
+        for field in indexes:
+            self.add_index(field)
+
+    # Method to add an index on a field, filling it from the records already in the table
+    def add_index(self, field):
+        index = SecondaryIndex(field)
+        for key, record in self.table.items():
+            index.add(key, record)
+        self.indexes[field] = index
+        return index
+
+    # Method to insert a key-value pair, updating every index (including on overwrite)
+    def insert(self, key, value):
+        if self.indexes:
+            old_value = self.table.retrieve(key)
+            if old_value is not None:
+                for index in self.indexes.values():
+                    index.remove(key, old_value)
+            for index in self.indexes.values():
+                index.add(key, value)
+        self.table.insert(key, value)
+
+    # Method to remove a key from the table and from every index
+    def delete(self, key):
+        value = self.table.delete(key)
+        if value is not None:
+            for index in self.indexes.values():
+                index.remove(key, value)
+        return value
+
+    # Method to retrieve a value based on a key
+    def retrieve(self, key):
+        return self.table.retrieve(key)
+
+    # Method to return every key-value pair in the table
+    def items(self):
+        return self.table.items()
+
+    # Method to make room for num_entries entries in total in the wrapped table
+    def reserve(self, num_entries):
+        self.table.reserve(num_entries)
+
+    # Size, capacity and sorted key index are the wrapped table's own
+    @property
+    def size(self):
+        return self.table.size
+
+    @property
+    def num_buckets(self):
+        return self.table.capacity()
+
+    @property
+    def index(self):
+        return self.table.index
+
+    # Method to return the keys of the records matching every condition, e.g. keys(state="Ohio")
+    # A condition value can be a list, tuple or set to match any one of several values
+    def keys(self, **conditions):
+        postings = []
+        for field, wanted in conditions.items():
+            if field not in self.indexes:
+                raise KeyError(f"No index on '{field}'. Indexed fields: {', '.join(self.indexes) or 'none'}.")
+            index = self.indexes[field]
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                postings.append(set().union(*(index.lookup(value) for value in wanted)))
+            else:
+                postings.append(index.lookup(wanted))
+        if not postings:
+            return set()
+        # Intersect starting from the smallest posting list, so the work follows the result size
+        postings.sort(key=len)
+        result = set(postings[0])
+        for keys in postings[1:]:
+            if not result:
+                break
+            result &= keys
+        return result
+
+    # Method to return the (key, record) pairs matching every condition, sorted by key
+    def query(self, **conditions):
+        retrieve = self.table.retrieve
+        return [(key, retrieve(key)) for key in sorted(self.keys(**conditions))]
+
+    # Method to count the records matching every condition without fetching them
+    def count(self, **conditions):
+        return len(self.keys(**conditions))
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Attendance report for one state by scanning every record, for comparison with the index
+def scan_state(table, state):
+    return sorted((key, record) for key, record in table.items() if record['state'] == state)
+
+
+# Main execution
+if __name__ == "__main__":
+    state = sys.argv[1] if len(sys.argv) > 1 else "Ohio"
+
+    registrations = IndexedHashTable(HashTable(1000), indexes=["state"])
+    registrations.insert_many(registration_items(bundled_dataset(1000)))
+
+    report, index_time = measure_runtime(registrations.query, state=state)
+    scanned, scan_time = measure_runtime(scan_state, registrations.table, state)
+    print(f"Attendees from {state}: {len(report)}")
+    for key, _ in report:
+        print(f"  {key}")
+    print(f"Index query: {index_time:.6f} seconds, full scan: {scan_time:.6f} seconds")
+    print(f"Attendees per state: {registrations.indexes['state'].counts()}")
@@ -0,0 +1,121 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Thread-safe hash table that spreads keys over independently locked shards
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import sys, threading
+from main import BaseHashTable, HashTable, ENGINES, measure_runtime, registration_key
+
+# Multiplier used to mix the key hash before picking a shard (the 64-bit golden ratio)
+SHARD_MIX = 0x9E3779B97F4A7C15
+MASK_64 = (1 << 64) - 1
+
+# Hash table split into num_shards independent hash tables, each guarded by its own lock
+# Threads working on keys in different shards never wait on each other
+# Bulk loads, sorted reads and printing come from BaseHashTable, on top of the locked insert and items
+class ShardedHashTable(BaseHashTable):
+    # The shards keep no shared key index, so sorted reads sort the combined items
+    index = None
+
+    def __init__(self, num_shards, num_buckets, engine=HashTable, **table_options):
+        self.num_shards = num_shards
+        buckets_per_shard = max(1, num_buckets // num_shards)
+        self.shards = [engine(buckets_per_shard, **table_options) for _ in range(num_shards)]
+        self.locks = [threading.Lock() for _ in range(num_shards)]
+
+    # Pick the shard for a key from the high bits of the mixed hash, so the shard choice
+    # doesn't line up with the bucket choice inside the shard
+    def shard_index(self, key):
+        return (((hash(key) * SHARD_MIX) & MASK_64) >> 32) % self.num_shards
+
+    # Method to insert a key-value pair, locking only the shard that owns the key
+    def insert(self, key, value):
+        index = self.shard_index(key)
+        with self.locks[index]:
+            self.shards[index].insert(key, value)
+
+    # Method to retrieve a value based on a key, locking only the shard that owns the key
+    def retrieve(self, key):
+        index = self.shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].retrieve(key)
+
+    # Method to remove a key, locking only the shard that owns the key
+    def delete(self, key):
+        index = self.shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    # Method to make room for num_entries entries in total, spread evenly over the shards
+    def reserve(self, num_entries):
+        per_shard = num_entries // self.num_shards + 1
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                shard.reserve(per_shard)
+
+    # Method to return every key-value pair, taking each shard's lock in turn
+    def items(self):
+        all_items = []
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                all_items.extend(shard.items())
+        return all_items
+
+    # Total number of entries across the shards - a property so it reads like every other table's size
+    @property
+    def size(self):
+        return sum(shard.size for shard in self.shards)
+
+    # Total number of buckets across the shards, which capacity() and load_factor() report
+    @property
+    def num_buckets(self):
+        return sum(shard.capacity() for shard in self.shards)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Run insert_then_retrieve on num_threads threads at once, each with its own slice of the keys
+def run_threads(table, keys, num_threads):
+    barrier = threading.Barrier(num_threads)
+
+    def worker(thread_keys):
+        barrier.wait()
+        for key in thread_keys:
+            table.insert(key, key)
+        for key in thread_keys:
+            table.retrieve(key)
+
+    threads = [threading.Thread(target=worker, args=(keys[number::num_threads],))
+               for number in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+# Measure multi-threaded insert/retrieve throughput for each shard count
+# One shard is the single-lock baseline every other shard count is compared against
+def measure_threaded_runtime(keys, shard_counts, num_threads, engine="chaining"):
+    results = []
+    for num_shards in shard_counts:
+        table = ShardedHashTable(num_shards, len(keys), engine=ENGINES[engine])
+        _, run_time = measure_runtime(run_threads, table, keys, num_threads)
+        # Every key is inserted once and retrieved once
+        throughput = 2 * len(keys) / run_time
+        print(f"{num_shards:>3} shard(s), {num_threads} threads ({engine}): {run_time:.6f} seconds, "
+              f"{throughput:,.0f} operations/second")
+        results.append((num_shards, num_threads, run_time, throughput))
+    return results
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Main execution
+if __name__ == "__main__":
+    # Optional arguments: number of threads, then engine, e.g. "python sharded.py 8 robinhood"
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    engine = sys.argv[2] if len(sys.argv) > 2 else "chaining"
+
+    # Synthetic registrations so the run is large enough for the threads to overlap
+    states = ["Ohio", "Texas", "Maine", "Idaho", "Utah", "Iowa", "Nevada", "Oregon"]
+    keys = [registration_key({'name': f"Attendee {number}", 'state': states[number % len(states)]})
+            for number in range(200000)]
+
+    measure_threaded_runtime(keys, [1, 2, 4, 8, 16, 32], num_threads, engine)
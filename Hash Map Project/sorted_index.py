@@ -0,0 +1,47 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Alexander Brittain
+# Sorted key index kept beside a hash table so ordered reads don't have to re-sort
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from bisect import bisect_left, bisect_right, insort
+
+# Sorted array of keys, updated with binary search as new keys are inserted
+class SortedKeyIndex:
+    def __init__(self, keys=()):
+        self.keys = sorted(keys)
+
+    # Method to add a key that isn't in the index yet
+    def add(self, key):
+        keys = self.keys
+        # Keys usually arrive out of order, but appending to the end is the common fast case
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            insort(keys, key)
+
+    # Method to remove a key from the index if it is present
+    def remove(self, key):
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    # Iterate over the keys in sorted order
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # Method to return the keys between low and high (inclusive) in sorted order
+    def range(self, low, high):
+        return self.keys[bisect_left(self.keys, low):bisect_right(self.keys, high)]
+
+    # Method to return the keys that start with a given prefix in sorted order
+    def prefix(self, prefix):
+        keys = self.keys
+        start = bisect_left(keys, prefix)
+        end = start
+        # Every key with the prefix sorts in one run straight after the prefix itself
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+        return keys[start:end]